@@ -43,14 +43,16 @@ def fix_dependencies():
     ]
     
     print("📦 Installing/updating dependencies...")
-    for dep in deps:
-        try:
-            subprocess.run([
-                sys.executable, '-m', 'pip', 'install', '--upgrade', dep
-            ], check=True, capture_output=True)
+    try:
+        # One pip invocation for everything - pip startup and index fetch
+        # are the slow part, so don't pay them once per package
+        subprocess.run([
+            sys.executable, '-m', 'pip', 'install', '--upgrade', *deps
+        ], check=True, capture_output=True)
+        for dep in deps:
             print(f"✅ {dep.split('>=')[0]}")
-        except:
-            print(f"⚠️  {dep.split('>=')[0]} - using existing version")
+    except:
+        print("⚠️  Batch install failed - using existing versions")
     
     print("\n✅ Termux compatibility fix completed!")
     print("Now try running: python main.py")
@@ -14,12 +14,18 @@ Features:
 import os
 import re
 import sys
-import time
+import hashlib
 import json
 import signal
+import asyncio
 import requests
 import subprocess
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import urlparse, parse_qs
 from datetime import datetime
 import psutil
@@ -32,9 +38,10 @@ from dotenv import load_dotenv
 
 # Audio metadata libraries
 import mutagen
-from mutagen.mp3 import MP3
-from mutagen.id3 import ID3, APIC, TIT2, TPE1, TALB, TPE2, TRCK, TPOS, TDRC, TCON, COMM
+from mutagen.id3 import ID3, ID3NoHeaderError, APIC, TIT2, TPE1, TALB, TPE2, TRCK, TPOS, TDRC, TCON, COMM
 from mutagen.flac import FLAC
+from mutagen.mp4 import MP4, MP4Cover
+from mutagen.oggopus import OggOpus
 from PIL import Image
 
 # Progress and terminal colors
@@ -42,25 +49,47 @@ from tqdm import tqdm
 import colorama
 from colorama import Fore, Style
 
-# Initialize colorama
+# Initialize colorama and bind the codes we use once - the escape
+# strings never change, so skip the attribute lookups in every print
 colorama.init()
+CYAN, GREEN, YELLOW, RED, BLUE = Fore.CYAN, Fore.GREEN, Fore.YELLOW, Fore.RED, Fore.BLUE
+RESET = Style.RESET_ALL
 
 # Load environment variables
 load_dotenv()
 
 class TermuxSpotifyDownloader:
-    def __init__(self):
-        print(f"{Fore.CYAN}🎵 Initializing Termux Spotify YouTube Downloader...{Style.RESET_ALL}")
-        
+    # Single-pass filename sanitizing (one translate call instead of
+    # one str.replace per invalid character)
+    _SANITIZE_TABLE = str.maketrans('', '', '<>:"/\\|?*')
+    _WS_RE = re.compile(r'\s+')
+
+    # Playlist URL/URI/ID parsers (compiled once)
+    _PLAYLIST_RE = re.compile(r'(?:open\.spotify\.com/playlist/|spotify:playlist:)([A-Za-z0-9]{22})')
+    _PLAYLIST_ID_RE = re.compile(r'[A-Za-z0-9]{22}')
+
+    # Output formats we can tag directly. 'opus'/'m4a' let ffmpeg copy the
+    # stream when YouTube already serves that codec - no lossy re-encode.
+    SUPPORTED_FORMATS = ('mp3', 'opus', 'm4a')
+
+    def __init__(self, audio_format='mp3'):
+        print(f"{CYAN}🎵 Initializing Termux Spotify YouTube Downloader...{RESET}")
+
+        if audio_format not in self.SUPPORTED_FORMATS:
+            print(f"{YELLOW}⚠️  Unknown format '{audio_format}', using mp3{RESET}")
+            audio_format = 'mp3'
+        self.audio_format = audio_format
+
         # Environment detection
         self.is_termux = self.detect_termux_environment()
         self.termux_api_available = self.check_termux_api() if self.is_termux else False
         
         if self.is_termux:
-            print(f"{Fore.GREEN}📱 Termux environment detected - applying mobile optimizations{Style.RESET_ALL}")
+            print(f"{GREEN}📱 Termux environment detected - applying mobile optimizations{RESET}")
         
         # Initialize components
         self.setup_spotify()
+        self.setup_http_session()
         self.setup_paths()
         self.setup_youtube_downloader()
         self.setup_mobile_features()
@@ -98,7 +127,7 @@ class TermuxSpotifyDownloader:
         client_secret = os.getenv('SPOTIFY_CLIENT_SECRET')
         
         if not client_id or not client_secret:
-            print(f"{Fore.RED}❌ Error: Spotify credentials not found!{Style.RESET_ALL}")
+            print(f"{RED}❌ Error: Spotify credentials not found!{RESET}")
             print("Please create a .env file with:")
             print("SPOTIFY_CLIENT_ID=your_client_id")
             print("SPOTIFY_CLIENT_SECRET=your_client_secret")
@@ -118,12 +147,28 @@ class TermuxSpotifyDownloader:
             
             # Test connection
             self.spotify.search('test', limit=1, type='artist')
-            print(f"{Fore.GREEN}✅ Spotify client initialized successfully{Style.RESET_ALL}")
+            print(f"{GREEN}✅ Spotify client initialized successfully{RESET}")
             
         except Exception as e:
-            print(f"{Fore.RED}❌ Error initializing Spotify client: {e}{Style.RESET_ALL}")
+            print(f"{RED}❌ Error initializing Spotify client: {e}{RESET}")
             sys.exit(1)
     
+    def setup_http_session(self):
+        """Setup shared HTTP session with connection pooling for artwork downloads"""
+        self.http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=0.3,
+                              status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self.http.mount('https://', adapter)
+        self.http.mount('http://', adapter)
+
+        # In-memory album artwork cache (optimized JPEG bytes keyed by album ID)
+        self._art_cache = OrderedDict()
+        self._art_cache_max = 32 if self.is_termux else 128
+
     def setup_paths(self):
         """Setup download paths optimized for Termux/Android"""
         self.script_root = Path(__file__).parent.absolute()
@@ -147,9 +192,13 @@ class TermuxSpotifyDownloader:
         # Create directories
         self.download_root.mkdir(parents=True, exist_ok=True)
         self.temp_dir.mkdir(parents=True, exist_ok=True)
+
+        # On-disk artwork cache for cross-run reuse
+        self.art_cache_dir = self.script_root / '.art_cache'
+        self.art_cache_dir.mkdir(exist_ok=True)
         
-        print(f"{Fore.BLUE}📁 Download path: {self.download_root}{Style.RESET_ALL}")
-        print(f"{Fore.BLUE}🗂️  Temp path: {self.temp_dir}{Style.RESET_ALL}")
+        print(f"{BLUE}📁 Download path: {self.download_root}{RESET}")
+        print(f"{BLUE}🗂️  Temp path: {self.temp_dir}{RESET}")
         
         # Check storage space
         self.check_storage_space()
@@ -159,13 +208,13 @@ class TermuxSpotifyDownloader:
         try:
             usage = psutil.disk_usage(str(self.download_root))
             available_gb = usage.free / (1024**3)
-            print(f"{Fore.BLUE}💾 Available storage: {available_gb:.1f} GB{Style.RESET_ALL}")
+            print(f"{BLUE}💾 Available storage: {available_gb:.1f} GB{RESET}")
             
             if available_gb < 1:
-                print(f"{Fore.YELLOW}⚠️  Low storage space warning{Style.RESET_ALL}")
+                print(f"{YELLOW}⚠️  Low storage space warning{RESET}")
                 
         except Exception as e:
-            print(f"{Fore.YELLOW}⚠️  Could not check storage space: {e}{Style.RESET_ALL}")
+            print(f"{YELLOW}⚠️  Could not check storage space: {e}{RESET}")
     
     def setup_youtube_downloader(self):
         """Configure yt-dlp for maximum audio quality"""
@@ -191,11 +240,13 @@ class TermuxSpotifyDownloader:
             'format': format_selector,
             'outtmpl': '',  # Will be set dynamically
             
-            # Audio processing for maximum quality
+            # Audio processing for maximum quality. For opus/m4a targets
+            # ffmpeg just remuxes when the source codec already matches,
+            # skipping the double-lossy re-encode entirely.
             'postprocessors': [
                 {
                     'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
+                    'preferredcodec': self.audio_format,
                     'preferredquality': '0',  # VBR, best quality
                 },
                 {
@@ -242,7 +293,7 @@ class TermuxSpotifyDownloader:
             'writeinfojson': False,
         }
         
-        print(f"{Fore.GREEN}🎧 YouTube downloader configured for maximum quality{Style.RESET_ALL}")
+        print(f"{GREEN}🎧 YouTube downloader configured for maximum quality{RESET}")
     
     def setup_mobile_features(self):
         """Setup mobile-specific features"""
@@ -253,33 +304,33 @@ class TermuxSpotifyDownloader:
             # Setup notifications
             if self.termux_api_available:
                 self.send_notification("Spotify Downloader", "Notifications enabled")
-                print(f"{Fore.GREEN}🔔 Notifications enabled{Style.RESET_ALL}")
+                print(f"{GREEN}🔔 Notifications enabled{RESET}")
             else:
-                print(f"{Fore.YELLOW}⚠️  Termux:API not available - install for full features{Style.RESET_ALL}")
+                print(f"{YELLOW}⚠️  Termux:API not available - install for full features{RESET}")
             
-            print(f"{Fore.GREEN}📱 Mobile features initialized{Style.RESET_ALL}")
+            print(f"{GREEN}📱 Mobile features initialized{RESET}")
     
     def request_storage_permission(self):
         """Request storage permission for Termux"""
         try:
             storage_path = Path('/storage/emulated/0')
             if storage_path.exists() and os.access(storage_path, os.W_OK):
-                print(f"{Fore.GREEN}✅ Storage permission already granted{Style.RESET_ALL}")
+                print(f"{GREEN}✅ Storage permission already granted{RESET}")
                 return True
             
-            print(f"{Fore.CYAN}📱 Requesting storage permission...{Style.RESET_ALL}")
+            print(f"{CYAN}📱 Requesting storage permission...{RESET}")
             result = subprocess.run(['termux-setup-storage'], 
                                   capture_output=True, text=True, timeout=30)
             
             if result.returncode == 0:
-                print(f"{Fore.GREEN}✅ Storage permission granted{Style.RESET_ALL}")
+                print(f"{GREEN}✅ Storage permission granted{RESET}")
                 return True
             else:
-                print(f"{Fore.YELLOW}⚠️  Please manually run 'termux-setup-storage'{Style.RESET_ALL}")
+                print(f"{YELLOW}⚠️  Please manually run 'termux-setup-storage'{RESET}")
                 return False
                 
         except Exception as e:
-            print(f"{Fore.YELLOW}⚠️  Storage permission setup failed: {e}{Style.RESET_ALL}")
+            print(f"{YELLOW}⚠️  Storage permission setup failed: {e}{RESET}")
             return False
     
     def send_notification(self, title, content, priority="default"):
@@ -301,42 +352,47 @@ class TermuxSpotifyDownloader:
     
     def signal_handler(self, signum, frame):
         """Handle graceful shutdown"""
-        print(f"\n{Fore.YELLOW}🛑 Shutdown signal received. Cleaning up...{Style.RESET_ALL}")
+        print(f"\n{YELLOW}🛑 Shutdown signal received. Cleaning up...{RESET}")
         self.is_downloading = False
         sys.exit(0)
     
     def extract_playlist_id(self, playlist_url):
         """Extract playlist ID from various Spotify URL formats"""
-        if 'open.spotify.com' in playlist_url:
-            if '/playlist/' in playlist_url:
-                return playlist_url.split('/playlist/')[-1].split('?')[0]
-        
-        if playlist_url.startswith('spotify:playlist:'):
-            return playlist_url.split('spotify:playlist:')[-1]
-        
-        if len(playlist_url) == 22 and playlist_url.replace('-', '').replace('_', '').isalnum():
+        match = self._PLAYLIST_RE.search(playlist_url)
+        if match:
+            return match.group(1)
+
+        # Bare 22-character playlist ID
+        if self._PLAYLIST_ID_RE.fullmatch(playlist_url):
             return playlist_url
-            
+
         raise ValueError("Invalid Spotify playlist URL format")
     
     def get_playlist_tracks(self, playlist_url):
         """Get all tracks from Spotify playlist"""
         try:
             playlist_id = self.extract_playlist_id(playlist_url)
-            print(f"{Fore.CYAN}📋 Fetching playlist: {playlist_id}{Style.RESET_ALL}")
+            print(f"{CYAN}📋 Fetching playlist: {playlist_id}{RESET}")
             
             # Get playlist info
             playlist = self.spotify.playlist(playlist_id)
             playlist_name = playlist['name']
             
-            print(f"{Fore.CYAN}📋 Playlist: {playlist_name}{Style.RESET_ALL}")
-            print(f"{Fore.CYAN}👤 Owner: {playlist['owner']['display_name']}{Style.RESET_ALL}")
+            print(f"{CYAN}📋 Playlist: {playlist_name}{RESET}")
+            print(f"{CYAN}👤 Owner: {playlist['owner']['display_name']}{RESET}")
             
-            # Get all tracks with pagination
+            # Get all tracks with pagination, projecting only the fields we
+            # actually read (drops available_markets etc. from the payload)
+            track_fields = (
+                'items(track(name,track_number,disc_number,duration_ms,'
+                'popularity,explicit,external_ids.isrc,external_urls.spotify,'
+                'artists(id,name),album(id,name,release_date,images,artists(name)))),next'
+            )
             tracks = []
-            results = self.spotify.playlist_tracks(playlist_id, limit=50)
+            results = self.spotify.playlist_tracks(
+                playlist_id, limit=100, fields=track_fields, additional_types=('track',))
             tracks.extend(results['items'])
-            
+
             while results['next']:
                 results = self.spotify.next(results)
                 tracks.extend(results['items'])
@@ -344,55 +400,69 @@ class TermuxSpotifyDownloader:
             # Process tracks
             track_list = []
             for i, item in enumerate(tracks, 1):
-                if item['track'] and item['track']['type'] == 'track':
+                # additional_types=('track',) filters episodes server-side;
+                # removed/unavailable entries still come back as null
+                if item['track']:
                     track = item['track']
-                    
+                    album = track['album']
+                    artist_names = [artist['name'] for artist in track['artists']]
+
                     # Get album artwork URL
                     album_cover_url = None
-                    if track['album'].get('images'):
-                        album_cover_url = max(track['album']['images'], 
+                    if album.get('images'):
+                        album_cover_url = max(album['images'],
                                             key=lambda x: x.get('width', 0))['url']
-                    
+
                     # Parse release date
                     release_year = None
                     try:
-                        if track['album'].get('release_date'):
-                            release_year = int(track['album']['release_date'].split('-')[0])
+                        if album.get('release_date'):
+                            release_year = int(album['release_date'].split('-')[0])
                     except:
                         pass
-                    
+
                     track_info = {
                         'index': i,
                         'name': track['name'],
-                        'artists': [artist['name'] for artist in track['artists']],
-                        'album': track['album']['name'],
-                        'album_artist': track['album']['artists'][0]['name'] if track['album']['artists'] else track['artists'][0]['name'],
+                        'artists': artist_names,
+                        'album': album['name'],
+                        'album_id': album['id'],
+                        'album_artist': album['artists'][0]['name'] if album['artists'] else artist_names[0],
                         'track_number': track['track_number'],
-                        'disc_number': track.get('disc_number', 1),
+                        'disc_number': track['disc_number'],
                         'duration_ms': track['duration_ms'],
                         'release_year': release_year,
                         'isrc': track['external_ids'].get('isrc', ''),
                         'album_cover_url': album_cover_url,
-                        'popularity': track.get('popularity', 0),
-                        'explicit': track.get('explicit', False),
-                        'search_query': f"{', '.join([artist['name'] for artist in track['artists']])} - {track['name']}",
+                        'popularity': track['popularity'],
+                        'explicit': track['explicit'],
+                        'search_query': f"{', '.join(artist_names)} - {track['name']}",
                         'spotify_url': track['external_urls']['spotify'],
-                        'genres': []
+                        'genres': [],
+                        '_artist_id': track['artists'][0]['id'] if track['artists'] else None
                     }
-                    
-                    # Get genres from artist
-                    try:
-                        artist_info = self.spotify.artist(track['artists'][0]['id'])
-                        track_info['genres'] = artist_info.get('genres', [])[:3]
-                    except:
-                        pass
-                    
+
                     track_list.append(track_info)
-                    
+
                     if i % 10 == 0:
-                        print(f"{Fore.BLUE}📝 Processed {i}/{len(tracks)} tracks...{Style.RESET_ALL}")
-            
-            print(f"{Fore.GREEN}✅ Found {len(track_list)} tracks{Style.RESET_ALL}")
+                        print(f"{BLUE}📝 Processed {i}/{len(tracks)} tracks...{RESET}")
+
+            # Resolve genres via the bulk artists() endpoint (50 IDs per call)
+            genre_map = {}
+            unique_artist_ids = list({t['_artist_id'] for t in track_list if t['_artist_id']})
+            for start in range(0, len(unique_artist_ids), 50):
+                chunk = unique_artist_ids[start:start + 50]
+                try:
+                    for artist in self.spotify.artists(chunk)['artists']:
+                        if artist:
+                            genre_map[artist['id']] = artist.get('genres', [])[:3]
+                except:
+                    pass
+
+            for track_info in track_list:
+                track_info['genres'] = genre_map.get(track_info.pop('_artist_id'), [])
+
+            print(f"{GREEN}✅ Found {len(track_list)} tracks{RESET}")
             
             return {
                 'name': playlist_name,
@@ -401,86 +471,153 @@ class TermuxSpotifyDownloader:
             }, track_list
             
         except Exception as e:
-            print(f"{Fore.RED}❌ Error fetching playlist: {e}{Style.RESET_ALL}")
+            print(f"{RED}❌ Error fetching playlist: {e}{RESET}")
             return None, []
     
     def sanitize_filename(self, filename):
         """Create safe filename"""
-        invalid_chars = '<>:"/\\|?*'
-        for char in invalid_chars:
-            filename = filename.replace(char, '')
-        
-        filename = re.sub(r'\s+', ' ', filename).strip()
+        filename = filename.translate(self._SANITIZE_TABLE)
+        filename = self._WS_RE.sub(' ', filename).strip()
+
         max_length = 150 if self.is_termux else 200
-        if len(filename) > max_length:
-            filename = filename[:max_length]
-        
-        return filename
+        return filename[:max_length]
     
-    def download_album_artwork(self, url, file_path):
-        """Download and optimize album artwork"""
+    def fetch_album_artwork(self, url):
+        """Download album artwork and return optimized JPEG bytes"""
         try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            
-            with open(file_path, 'wb') as f:
-                f.write(response.content)
-            
-            # Optimize for mobile
+            with self.http.get(url, timeout=(5, 30), stream=True) as response:
+                response.raise_for_status()
+                buffer = BytesIO()
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    buffer.write(chunk)
+                artwork_data = buffer.getvalue()
+
+            # Optimize for mobile (in memory, no temp file)
             if self.is_termux:
-                with Image.open(file_path) as img:
+                with Image.open(BytesIO(artwork_data)) as img:
+                    # Spotify covers are usually 640x640 RGB JPEGs - keep the
+                    # original bytes and skip the decode/re-encode entirely
+                    if (img.format == 'JPEG' and img.mode == 'RGB' and
+                            img.size[0] <= 800 and img.size[1] <= 800):
+                        return artwork_data
+
+                    # Let libjpeg downscale during decode (1/2, 1/4, 1/8 steps)
+                    img.draft('RGB', (800, 800))
+
                     if img.mode in ('RGBA', 'P'):
                         img = img.convert('RGB')
-                    
+
                     # Resize for mobile
                     if img.size[0] > 800 or img.size[1] > 800:
-                        img.thumbnail((800, 800), Image.Resampling.LANCZOS)
-                    
-                    img.save(file_path, 'JPEG', quality=90, optimize=True)
-            
-            return True
-            
+                        img.thumbnail((800, 800), Image.Resampling.BILINEAR)
+
+                    buffer = BytesIO()
+                    img.save(buffer, 'JPEG', quality=90)
+                    artwork_data = buffer.getvalue()
+
+            return artwork_data
+
         except Exception as e:
-            print(f"{Fore.YELLOW}⚠️  Could not download artwork: {e}{Style.RESET_ALL}")
-            return False
+            print(f"{YELLOW}⚠️  Could not download artwork: {e}{RESET}")
+            return None
+
+    def _art_cache_path(self, key):
+        """On-disk location for prepared artwork, sharded by hash prefix"""
+        digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        shard = self.art_cache_dir / digest[:2]
+        shard.mkdir(exist_ok=True)
+        return shard / f"{digest[2:]}.jpg"
+
+    def get_album_artwork(self, track_info):
+        """Get artwork bytes for a track, cached per album"""
+        url = track_info.get('album_cover_url')
+        if not url:
+            return None
+
+        key = track_info.get('album_id') or url
+        artwork_data = self._art_cache.get(key)
+        if artwork_data is not None:
+            self._art_cache.move_to_end(key)
+            return artwork_data
+
+        # Disk cache survives across runs, so re-downloading a playlist
+        # only fetches covers for albums it hasn't seen before
+        cache_file = self._art_cache_path(key)
+        if cache_file.exists():
+            artwork_data = cache_file.read_bytes()
+        else:
+            artwork_data = self.fetch_album_artwork(url)
+            if artwork_data:
+                try:
+                    cache_file.write_bytes(artwork_data)
+                except OSError:
+                    pass
+
+        if artwork_data:
+            self._art_cache[key] = artwork_data
+            while len(self._art_cache) > self._art_cache_max:
+                self._art_cache.popitem(last=False)
+
+        return artwork_data
+
+    def _artwork_batch(self, tracks):
+        """Prefetch distinct album covers in parallel through the pooled session"""
+        pending = []
+        seen = set()
+        for track in tracks:
+            if not track.get('album_cover_url'):
+                continue
+            key = track.get('album_id') or track['album_cover_url']
+            if key not in self._art_cache and key not in seen:
+                seen.add(key)
+                pending.append(track)
+
+        if not pending:
+            return
+
+        print(f"{CYAN}🎨 Prefetching {len(pending)} album covers...{RESET}")
+
+        workers = 4 if self.is_termux else 8
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(self.get_album_artwork, pending))
     
-    def embed_metadata(self, audio_file, track_info, artwork_path=None):
+    def embed_metadata(self, audio_file, track_info, artwork_data=None):
         """Embed metadata into audio file"""
         try:
             audio_path = Path(audio_file)
-            
+
             if audio_path.suffix.lower() == '.mp3':
-                return self._embed_mp3_metadata(audio_path, track_info, artwork_path)
+                return self._embed_mp3_metadata(audio_path, track_info, artwork_data)
             elif audio_path.suffix.lower() == '.flac':
-                return self._embed_flac_metadata(audio_path, track_info, artwork_path)
+                return self._embed_flac_metadata(audio_path, track_info, artwork_data)
+            elif audio_path.suffix.lower() in ('.m4a', '.mp4'):
+                return self._embed_mp4_metadata(audio_path, track_info, artwork_data)
+            elif audio_path.suffix.lower() == '.opus':
+                return self._embed_opus_metadata(audio_path, track_info, artwork_data)
             else:
                 # Convert to MP3 if unsupported
                 mp3_file = audio_path.with_suffix('.mp3')
                 if self._convert_to_mp3(audio_path, mp3_file):
                     audio_path.unlink()
-                    return self._embed_mp3_metadata(mp3_file, track_info, artwork_path)
+                    return self._embed_mp3_metadata(mp3_file, track_info, artwork_data)
                 else:
-                    print(f"{Fore.YELLOW}⚠️  Unsupported format: {audio_path.suffix}{Style.RESET_ALL}")
+                    print(f"{YELLOW}⚠️  Unsupported format: {audio_path.suffix}{RESET}")
                     return False
                     
         except Exception as e:
-            print(f"{Fore.RED}❌ Metadata embedding error: {e}{Style.RESET_ALL}")
+            print(f"{RED}❌ Metadata embedding error: {e}{RESET}")
             return False
     
-    def _embed_mp3_metadata(self, mp3_file, track_info, artwork_path=None):
+    def _embed_mp3_metadata(self, mp3_file, track_info, artwork_data=None):
         """Embed metadata into MP3 file"""
         try:
+            # Edit the ID3 block directly - no need to parse the audio frames
             try:
-                audio = MP3(mp3_file, ID3=ID3)
-            except:
-                audio = MP3(mp3_file)
-            
-            if audio.tags is None:
-                audio.add_tags()
-            
-            tags = audio.tags
-            tags.clear()
-            
+                tags = ID3(mp3_file)
+                tags.clear()
+            except ID3NoHeaderError:
+                tags = ID3()
+
             # Basic metadata
             tags.add(TIT2(encoding=3, text=track_info['name']))
             tags.add(TPE1(encoding=3, text=', '.join(track_info['artists'])))
@@ -502,10 +639,7 @@ class TermuxSpotifyDownloader:
             tags.add(COMM(encoding=3, lang='eng', desc='', text=comment))
             
             # Album artwork
-            if artwork_path and Path(artwork_path).exists():
-                with open(artwork_path, 'rb') as f:
-                    artwork_data = f.read()
-                
+            if artwork_data:
                 tags.add(APIC(
                     encoding=3,
                     mime='image/jpeg',
@@ -513,17 +647,17 @@ class TermuxSpotifyDownloader:
                     desc='Album Cover',
                     data=artwork_data
                 ))
-                print(f"{Fore.GREEN}🎨 Embedded album artwork{Style.RESET_ALL}")
-            
-            audio.save(v2_version=3)
-            print(f"{Fore.GREEN}✅ MP3 metadata embedded{Style.RESET_ALL}")
+                print(f"{GREEN}🎨 Embedded album artwork{RESET}")
+
+            tags.save(mp3_file, v2_version=3)
+            print(f"{GREEN}✅ MP3 metadata embedded{RESET}")
             return True
             
         except Exception as e:
-            print(f"{Fore.RED}❌ MP3 metadata error: {e}{Style.RESET_ALL}")
+            print(f"{RED}❌ MP3 metadata error: {e}{RESET}")
             return False
     
-    def _embed_flac_metadata(self, flac_file, track_info, artwork_path=None):
+    def _embed_flac_metadata(self, flac_file, track_info, artwork_data=None):
         """Embed metadata into FLAC file"""
         try:
             audio = FLAC(flac_file)
@@ -549,10 +683,8 @@ class TermuxSpotifyDownloader:
             audio['COMMENT'] = f"Downloaded from YouTube | Spotify: {track_info['spotify_url']}"
             
             # Album artwork
-            if artwork_path and Path(artwork_path).exists():
-                with open(artwork_path, 'rb') as f:
-                    artwork_data = f.read()
-                
+            if artwork_data:
+                audio.clear_pictures()
                 picture = mutagen.flac.Picture()
                 picture.type = 3
                 picture.mime = 'image/jpeg'
@@ -560,16 +692,93 @@ class TermuxSpotifyDownloader:
                 picture.data = artwork_data
                 
                 audio.add_picture(picture)
-                print(f"{Fore.GREEN}🎨 Embedded FLAC artwork{Style.RESET_ALL}")
+                print(f"{GREEN}🎨 Embedded FLAC artwork{RESET}")
             
             audio.save()
-            print(f"{Fore.GREEN}✅ FLAC metadata embedded{Style.RESET_ALL}")
+            print(f"{GREEN}✅ FLAC metadata embedded{RESET}")
             return True
             
         except Exception as e:
-            print(f"{Fore.RED}❌ FLAC metadata error: {e}{Style.RESET_ALL}")
+            print(f"{RED}❌ FLAC metadata error: {e}{RESET}")
             return False
     
+    def _embed_mp4_metadata(self, m4a_file, track_info, artwork_data=None):
+        """Embed metadata into M4A/MP4 file"""
+        try:
+            audio = MP4(m4a_file)
+
+            # Basic metadata
+            audio['\xa9nam'] = [track_info['name']]
+            audio['\xa9ART'] = [', '.join(track_info['artists'])]
+            audio['\xa9alb'] = [track_info['album']]
+            audio['aART'] = [track_info['album_artist']]
+            audio['trkn'] = [(track_info['track_number'], 0)]
+            audio['disk'] = [(track_info['disc_number'], 0)]
+
+            if track_info['release_year']:
+                audio['\xa9day'] = [str(track_info['release_year'])]
+
+            if track_info.get('genres'):
+                audio['\xa9gen'] = [', '.join(track_info['genres'])]
+
+            audio['\xa9cmt'] = [f"Downloaded from YouTube | Spotify: {track_info['spotify_url']}"]
+
+            # Album artwork
+            if artwork_data:
+                audio['covr'] = [MP4Cover(artwork_data, imageformat=MP4Cover.FORMAT_JPEG)]
+                print(f"{GREEN}🎨 Embedded album artwork{RESET}")
+
+            audio.save()
+            print(f"{GREEN}✅ M4A metadata embedded{RESET}")
+            return True
+
+        except Exception as e:
+            print(f"{RED}❌ M4A metadata error: {e}{RESET}")
+            return False
+
+    def _embed_opus_metadata(self, opus_file, track_info, artwork_data=None):
+        """Embed metadata into Opus file"""
+        try:
+            audio = OggOpus(opus_file)
+
+            # Basic metadata (Vorbis comments)
+            audio['TITLE'] = track_info['name']
+            audio['ARTIST'] = ', '.join(track_info['artists'])
+            audio['ALBUM'] = track_info['album']
+            audio['ALBUMARTIST'] = track_info['album_artist']
+            audio['TRACKNUMBER'] = str(track_info['track_number'])
+            audio['DISCNUMBER'] = str(track_info['disc_number'])
+
+            if track_info['release_year']:
+                audio['DATE'] = str(track_info['release_year'])
+
+            if track_info.get('genres'):
+                audio['GENRE'] = ', '.join(track_info['genres'])
+
+            if track_info['isrc']:
+                audio['ISRC'] = track_info['isrc']
+
+            audio['COMMENT'] = f"Downloaded from YouTube | Spotify: {track_info['spotify_url']}"
+
+            # Album artwork (base64 FLAC picture block per the Vorbis spec)
+            if artwork_data:
+                import base64
+                picture = mutagen.flac.Picture()
+                picture.type = 3
+                picture.mime = 'image/jpeg'
+                picture.desc = 'Album Cover'
+                picture.data = artwork_data
+                audio['METADATA_BLOCK_PICTURE'] = [base64.b64encode(picture.write()).decode('ascii')]
+                print(f"{GREEN}🎨 Embedded album artwork{RESET}")
+
+            audio.save()
+            print(f"{GREEN}✅ Opus metadata embedded{RESET}")
+            return True
+
+        except Exception as e:
+            print(f"{RED}❌ Opus metadata error: {e}{RESET}")
+            return False
+
     def _convert_to_mp3(self, input_file, output_file):
         """Convert audio file to MP3 using ffmpeg"""
         try:
@@ -584,151 +793,214 @@ class TermuxSpotifyDownloader:
             result = subprocess.run(cmd, capture_output=True, text=True)
             
             if result.returncode == 0:
-                print(f"{Fore.GREEN}✅ Converted to MP3: {output_file.name}{Style.RESET_ALL}")
+                print(f"{GREEN}✅ Converted to MP3: {output_file.name}{RESET}")
                 return True
             else:
-                print(f"{Fore.RED}❌ Conversion failed: {result.stderr}{Style.RESET_ALL}")
+                print(f"{RED}❌ Conversion failed: {result.stderr}{RESET}")
                 return False
                 
         except Exception as e:
-            print(f"{Fore.RED}❌ Conversion error: {e}{Style.RESET_ALL}")
+            print(f"{RED}❌ Conversion error: {e}{RESET}")
             return False
     
-    def search_and_download(self, track_info, playlist_name):
-        """Search and download track with maximum quality"""
+    def _downloaded_filepath(self, info):
+        """Resolve the final output path reported by yt-dlp"""
+        if not info:
+            return None
+
+        if 'entries' in info:
+            if not info['entries']:
+                return None
+            info = info['entries'][0]
+
+        requested = info.get('requested_downloads')
+        if requested and requested[0].get('filepath'):
+            return Path(requested[0]['filepath'])
+
+        return None
+
+    def _search_and_fetch(self, track_info, playlist_name):
+        """Existence check plus yt-dlp search/download for one track.
+
+        Returns True when the track is already present, a
+        (downloaded_file, playlist_dir) pair on success, or None on failure.
+        """
         search_query = track_info['search_query']
         safe_filename = self.sanitize_filename(search_query)
-        
+
         # Create playlist directory
         playlist_dir = self.download_root / self.sanitize_filename(playlist_name)
         playlist_dir.mkdir(exist_ok=True)
-        
+
         # Check if file already exists
         existing_files = list(playlist_dir.glob(f"{safe_filename}.*"))
         if existing_files:
-            print(f"{Fore.YELLOW}⏭️  Skipping (already exists): {safe_filename}{Style.RESET_ALL}")
+            tqdm.write(f"{YELLOW}⏭️  Skipping (already exists): {safe_filename}{RESET}")
             return True
-        
-        print(f"{Fore.CYAN}🔍 Searching: {search_query}{Style.RESET_ALL}")
-        
+
+        tqdm.write(f"{CYAN}🔍 Searching: {search_query}{RESET}")
+
         try:
-            # Configure output path
-            temp_output = str(self.temp_dir / f"{safe_filename}.%(ext)s")
-            self.ydl_opts['outtmpl'] = temp_output
-            
-            # Progress hook
+            # Configure output path (per-call copy so concurrent workers don't clash)
+            ydl_opts = dict(self.ydl_opts)
+            ydl_opts['outtmpl'] = str(self.temp_dir / f"{safe_filename}.%(ext)s")
+
+            # Progress hook - the playlist bar tracks overall progress, so
+            # only report when a transfer finishes instead of every chunk
             def progress_hook(d):
-                if d['status'] == 'downloading':
-                    if 'total_bytes' in d:
-                        percent = (d['downloaded_bytes'] / d['total_bytes']) * 100
-                        print(f"\r{Fore.BLUE}📥 Downloading: {percent:.1f}%{Style.RESET_ALL}", end='', flush=True)
-                elif d['status'] == 'finished':
-                    print(f"\n{Fore.GREEN}✅ Downloaded: {Path(d['filename']).name}{Style.RESET_ALL}")
-            
-            self.ydl_opts['progress_hooks'] = [progress_hook]
-            
+                if d['status'] == 'finished':
+                    tqdm.write(f"{GREEN}✅ Downloaded: {Path(d['filename']).name}{RESET}")
+
+            ydl_opts['progress_hooks'] = [progress_hook]
+
             # Search and download
-            with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 try:
-                    # Search for best match
-                    info = ydl.extract_info(f"ytsearch1:{search_query}", download=False)
+                    # Search and download in a single extractor pass
+                    info = ydl.extract_info(f"ytsearch1:{search_query}", download=True)
                     if not info['entries']:
-                        print(f"{Fore.RED}❌ No results found for: {search_query}{Style.RESET_ALL}")
-                        return False
-                    
+                        tqdm.write(f"{RED}❌ No results found for: {search_query}{RESET}")
+                        return None
+
                     video_info = info['entries'][0]
                     video_title = video_info.get('title', 'Unknown')
                     duration = video_info.get('duration', 0)
-                    
+
                     # Verify duration similarity
                     expected_duration = track_info['duration_ms'] / 1000
                     if abs(duration - expected_duration) > 30:
-                        print(f"{Fore.YELLOW}⚠️  Duration mismatch: Expected {expected_duration:.0f}s, got {duration:.0f}s{Style.RESET_ALL}")
-                    
-                    print(f"{Fore.GREEN}🎯 Found: {video_title}{Style.RESET_ALL}")
-                    
-                    # Download
-                    ydl.download([video_info['webpage_url']])
-                    
+                        tqdm.write(f"{YELLOW}⚠️  Duration mismatch: Expected {expected_duration:.0f}s, got {duration:.0f}s{RESET}")
+
+                    tqdm.write(f"{GREEN}🎯 Found: {video_title}{RESET}")
+
+                    # yt-dlp reports the final post-processed path
+                    downloaded_file = self._downloaded_filepath(info)
+                    if downloaded_file is None:
+                        downloaded_file = Path(ydl.prepare_filename(video_info)).with_suffix(f'.{self.audio_format}')
+
                 except Exception as e:
-                    print(f"{Fore.RED}❌ Download failed: {e}{Style.RESET_ALL}")
-                    return False
-            
-            # Find downloaded file
-            temp_files = list(self.temp_dir.glob(f"{safe_filename}.*"))
-            if not temp_files:
-                print(f"{Fore.RED}❌ Downloaded file not found{Style.RESET_ALL}")
-                return False
-            
-            downloaded_file = temp_files[0]
-            
-            # Download album artwork
-            artwork_path = None
-            if track_info['album_cover_url']:
-                artwork_path = self.temp_dir / f"{safe_filename}_artwork.jpg"
-                if self.download_album_artwork(track_info['album_cover_url'], artwork_path):
-                    print(f"{Fore.GREEN}🎨 Downloaded album artwork{Style.RESET_ALL}")
-            
+                    tqdm.write(f"{RED}❌ Download failed: {e}{RESET}")
+                    return None
+
+            if not downloaded_file.exists():
+                tqdm.write(f"{RED}❌ Downloaded file not found{RESET}")
+                return None
+
+            return downloaded_file, playlist_dir
+
+        except Exception as e:
+            tqdm.write(f"{RED}❌ Error downloading track: {e}{RESET}")
+            return None
+
+    def _finalize_track(self, downloaded_file, track_info, playlist_dir):
+        """Artwork, tagging and move into the playlist directory"""
+        try:
+            # Album artwork (cached per album, usually prefetched by _artwork_batch)
+            artwork_data = self.get_album_artwork(track_info)
+
             # Embed metadata
-            if self.embed_metadata(downloaded_file, track_info, artwork_path):
-                print(f"{Fore.GREEN}📝 Metadata embedded successfully{Style.RESET_ALL}")
-            
+            if self.embed_metadata(downloaded_file, track_info, artwork_data):
+                tqdm.write(f"{GREEN}📝 Metadata embedded successfully{RESET}")
+
             # Move to final location
             final_file = playlist_dir / downloaded_file.name
             downloaded_file.rename(final_file)
-            
-            # Cleanup
-            if artwork_path and artwork_path.exists():
-                artwork_path.unlink()
-            
-            print(f"{Fore.GREEN}✅ Completed: {final_file.name}{Style.RESET_ALL}")
+
+            tqdm.write(f"{GREEN}✅ Completed: {final_file.name}{RESET}")
             return True
-            
+
         except Exception as e:
-            print(f"{Fore.RED}❌ Error processing track: {e}{Style.RESET_ALL}")
+            tqdm.write(f"{RED}❌ Error processing track: {e}{RESET}")
             return False
+
+    def search_and_download(self, track_info, playlist_name):
+        """Search and download track with maximum quality"""
+        fetched = self._search_and_fetch(track_info, playlist_name)
+        if fetched is True:
+            return True
+        if fetched is None:
+            return False
+
+        downloaded_file, playlist_dir = fetched
+        return self._finalize_track(downloaded_file, track_info, playlist_dir)
     
-    def download_playlist(self, playlist_url):
-        """Download entire playlist with progress tracking"""
+    def download_playlist(self, playlist_url, max_workers=None):
+        """Download entire playlist with concurrent workers and progress tracking"""
         playlist_info, tracks = self.get_playlist_tracks(playlist_url)
-        
+
         if not tracks:
-            print(f"{Fore.RED}❌ No tracks found in playlist{Style.RESET_ALL}")
+            print(f"{RED}❌ No tracks found in playlist{RESET}")
             return
-        
-        print(f"\n{Fore.CYAN}🎵 Starting download of '{playlist_info['name']}'{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}📊 Total tracks: {len(tracks)}{Style.RESET_ALL}")
-        
+
+        print(f"\n{CYAN}🎵 Starting download of '{playlist_info['name']}'{RESET}")
+        print(f"{CYAN}📊 Total tracks: {len(tracks)}{RESET}")
+
         if self.is_termux:
             self.send_notification("Spotify Downloader", f"Starting download: {playlist_info['name']}")
-        
+
+        # The per-track work is I/O bound (network + ffmpeg subprocess), so
+        # overlap tracks in a small thread pool driven from an asyncio loop
+        if max_workers is None:
+            max_workers = 2 if self.is_termux else 4
+
+        # Warm the artwork cache before downloads begin
+        self._artwork_batch(tracks)
+
         # Download with progress bar
         successful = 0
         failed = 0
-        
-        with tqdm(total=len(tracks), desc="Downloading", unit="track") as pbar:
-            for track in tracks:
-                if not self.is_downloading:
-                    break
-                
-                pbar.set_description(f"Downloading: {track['name'][:30]}...")
-                
-                if self.search_and_download(track, playlist_info['name']):
-                    successful += 1
-                else:
-                    failed += 1
-                    self.failed_downloads.append(track)
-                
-                pbar.update(1)
-                
-                # Brief pause for mobile optimization
-                if self.is_termux:
-                    time.sleep(1)
-        
+
+        async def _run():
+            nonlocal successful, failed
+            loop = asyncio.get_running_loop()
+            semaphore = asyncio.Semaphore(max_workers)
+
+            async def _worker(track):
+                # Hold the semaphore only for the network-bound download, so
+                # the next track's download overlaps this track's ffmpeg/tagging
+                async with semaphore:
+                    if not self.is_downloading:
+                        return track, None
+                    fetched = await loop.run_in_executor(
+                        dl_pool, self._search_and_fetch, track, playlist_info['name'])
+
+                if fetched is True:
+                    return track, True
+                if fetched is None:
+                    return track, False
+
+                downloaded_file, playlist_dir = fetched
+                ok = await loop.run_in_executor(
+                    pp_pool, self._finalize_track, downloaded_file, track, playlist_dir)
+                return track, ok
+
+            pp_workers = 1 if self.is_termux else 2
+            with ThreadPoolExecutor(max_workers=max_workers) as dl_pool, \
+                    ThreadPoolExecutor(max_workers=pp_workers) as pp_pool:
+                tasks = [asyncio.ensure_future(_worker(track)) for track in tracks]
+                with tqdm(total=len(tracks), desc="Downloading", unit="track",
+                          mininterval=0.5) as pbar:
+                    for future in asyncio.as_completed(tasks):
+                        track, ok = await future
+                        if ok is None:
+                            continue
+                        if ok:
+                            successful += 1
+                        else:
+                            failed += 1
+                            self.failed_downloads.append(track)
+                        pbar.set_postfix(ok=successful, fail=failed)
+                        pbar.update(1)
+
+        asyncio.run(_run())
+
+        # Free cached artwork once the playlist is done
+        self._art_cache.clear()
+
         # Summary
-        print(f"\n{Fore.GREEN}📊 Download Summary{Style.RESET_ALL}")
-        print(f"{Fore.GREEN}✅ Successful: {successful}{Style.RESET_ALL}")
-        print(f"{Fore.RED}❌ Failed: {failed}{Style.RESET_ALL}")
+        print(f"\n{GREEN}📊 Download Summary{RESET}")
+        print(f"{GREEN}✅ Successful: {successful}{RESET}")
+        print(f"{RED}❌ Failed: {failed}{RESET}")
         
         if self.is_termux:
             self.send_notification(
@@ -737,19 +1009,19 @@ class TermuxSpotifyDownloader:
             )
         
         if failed > 0:
-            print(f"\n{Fore.YELLOW}Failed tracks:{Style.RESET_ALL}")
+            print(f"\n{YELLOW}Failed tracks:{RESET}")
             for track in self.failed_downloads:
                 print(f"  - {track['search_query']}")
     
     def run_interactive(self):
         """Run interactive mode"""
-        print(f"\n{Fore.CYAN}🎵 Spotify to YouTube Downloader - Termux Edition{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}Maximum Audio Quality Mode{Style.RESET_ALL}")
+        print(f"\n{CYAN}🎵 Spotify to YouTube Downloader - Termux Edition{RESET}")
+        print(f"{CYAN}Maximum Audio Quality Mode{RESET}")
         print("=" * 50)
         
         while True:
             try:
-                playlist_url = input(f"\n{Fore.YELLOW}Enter Spotify playlist URL (or 'quit' to exit): {Style.RESET_ALL}")
+                playlist_url = input(f"\n{YELLOW}Enter Spotify playlist URL (or 'quit' to exit): {RESET}")
                 
                 if playlist_url.lower() in ['quit', 'exit', 'q']:
                     break
@@ -762,23 +1034,33 @@ class TermuxSpotifyDownloader:
                 self.is_downloading = False
                 
             except KeyboardInterrupt:
-                print(f"\n{Fore.YELLOW}🛑 Download interrupted{Style.RESET_ALL}")
+                print(f"\n{YELLOW}🛑 Download interrupted{RESET}")
                 self.is_downloading = False
                 break
             except Exception as e:
-                print(f"{Fore.RED}❌ Error: {e}{Style.RESET_ALL}")
+                print(f"{RED}❌ Error: {e}{RESET}")
                 continue
         
-        print(f"{Fore.CYAN}👋 Thanks for using Spotify Downloader!{Style.RESET_ALL}")
+        print(f"{CYAN}👋 Thanks for using Spotify Downloader!{RESET}")
 
 def main():
     """Main entry point"""
     try:
-        downloader = TermuxSpotifyDownloader()
-        
-        if len(sys.argv) > 1:
+        args = sys.argv[1:]
+
+        # Optional output format, e.g. --format opus (stream copy, no re-encode)
+        audio_format = 'mp3'
+        if '--format' in args:
+            index = args.index('--format')
+            if index + 1 < len(args):
+                audio_format = args[index + 1]
+            del args[index:index + 2]
+
+        downloader = TermuxSpotifyDownloader(audio_format=audio_format)
+
+        if args:
             # Command line mode
-            playlist_url = sys.argv[1]
+            playlist_url = args[0]
             downloader.is_downloading = True
             downloader.download_playlist(playlist_url)
         else:
@@ -786,9 +1068,9 @@ def main():
             downloader.run_interactive()
             
     except KeyboardInterrupt:
-        print(f"\n{Fore.YELLOW}🛑 Exiting...{Style.RESET_ALL}")
+        print(f"\n{YELLOW}🛑 Exiting...{RESET}")
     except Exception as e:
-        print(f"{Fore.RED}❌ Fatal error: {e}{Style.RESET_ALL}")
+        print(f"{RED}❌ Fatal error: {e}{RESET}")
         sys.exit(1)
 
 if __name__ == "__main__":
@@ -18,20 +18,42 @@ import re
 import sys
 import time
 import json
+import shutil
 import signal
 import requests
 import threading
 from pathlib import Path
+from functools import lru_cache
+from operator import itemgetter
 from urllib.parse import urlparse, parse_qs
 from datetime import datetime
 import subprocess
 import psutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from tqdm import tqdm
 
 import spotipy
 from spotipy.oauth2 import SpotifyClientCredentials
 import yt_dlp
+from PIL import Image
 from dotenv import load_dotenv
 
+# orjson is ~3x faster than stdlib json for the playlist cache, but the
+# stdlib is a perfectly good fallback when it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# libvips resizes JPEGs several times faster than stock PIL on ARM -
+# use it for oversized covers when the module happens to be installed
+try:
+    import pyvips
+except ImportError:
+    pyvips = None
+
 # Import utility modules
 from utils.termux_helpers import TermuxHelper
 from utils.audio_quality import AudioQualityManager
@@ -40,7 +62,35 @@ from utils.mobile_optimizations import MobileOptimizer
 # Load environment variables
 load_dotenv()
 
+# Resolved once - every instance shares the same script root
+SCRIPT_ROOT = Path(__file__).parent.absolute()
+
+# Playlist IDs are 22 base62 characters, in URLs or spotify: URIs
+_PLAYLIST_RE = re.compile(r'(?:open\.spotify\.com/playlist/|spotify:playlist:)([A-Za-z0-9]{22})')
+_PLAYLIST_ID_RE = re.compile(r'^[A-Za-z0-9]{22}$')
+
+class _RateLimiter:
+    """Minimal thread-safe pacing: spreads calls evenly over the window
+    instead of letting concurrent workers slam the API into 429s"""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / max(per_minute, 1)
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
 class TermuxSpotifyDownloader:
+    # Built once - sanitize_filename runs for every track and artwork path
+    _SANITIZE_TABLE = str.maketrans('', '', '<>:"/\\|?*')
+    _WS_RE = re.compile(r'\s+')
+
     def __init__(self):
         print("🎵 Initializing Termux Spotify YouTube Downloader...")
         
@@ -53,8 +103,9 @@ class TermuxSpotifyDownloader:
         self.is_termux = self.termux_helper.is_termux_environment()
         if self.is_termux:
             print("📱 Termux environment detected - applying mobile optimizations")
-        
+
         # Setup components
+        self.setup_http_session()
         self.setup_spotify()
         self.setup_paths()
         self.setup_youtube_downloader()
@@ -66,12 +117,36 @@ class TermuxSpotifyDownloader:
         self.download_queue = []
         self.failed_downloads = []
         self.completed_downloads = []
+        self._existing_stems = set()
+        self.completed_ids = set()
+        self._state_fp = None
+        self._failed_fh = None
+        self._manifest_fh = None
+        self._cached_free_bytes = None
+
+        # Keep YouTube searches under quota; Spotify calls are batched and
+        # already retry 429s with backoff via the session's Retry policy
+        self.youtube_limiter = _RateLimiter(
+            int(os.getenv('YOUTUBE_REQUESTS_PER_MINUTE', '30')))
         self.is_downloading = False
+        self._downloads_lock = threading.Lock()
         
         # Signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self.signal_handler)
         signal.signal(signal.SIGTERM, self.signal_handler)
         
+    def setup_http_session(self):
+        """Create one pooled HTTP session shared by spotipy and artwork fetches"""
+        self.http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=20,
+            max_retries=Retry(total=3, backoff_factor=0.3,
+                              status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self.http.mount('https://', adapter)
+        self.http.mount('http://', adapter)
+
     def setup_spotify(self):
         """Initialize Spotify client with error handling"""
         client_id = os.getenv('SPOTIFY_CLIENT_ID')
@@ -88,9 +163,13 @@ class TermuxSpotifyDownloader:
         try:
             client_credentials_manager = SpotifyClientCredentials(
                 client_id=client_id,
-                client_secret=client_secret
+                client_secret=client_secret,
+                requests_session=self.http
+            )
+            self.spotify = spotipy.Spotify(
+                client_credentials_manager=client_credentials_manager,
+                requests_session=self.http
             )
-            self.spotify = spotipy.Spotify(client_credentials_manager=client_credentials_manager)
             
             # Test connection with a simple call
             self.spotify.search('test', limit=1, type='artist')
@@ -102,19 +181,19 @@ class TermuxSpotifyDownloader:
     
     def setup_paths(self):
         """Setup download paths optimized for Termux/Android"""
-        self.script_root = Path(__file__).parent.absolute()
-        
+        self.script_root = SCRIPT_ROOT
+
         if self.is_termux:
-            # Termux-specific paths
+            # Termux-specific paths. Temp lives under the download root so
+            # the final move is a metadata-only rename, not a cross-mount
+            # copy between /data and /storage/emulated/0
             storage_root = Path("/storage/emulated/0")
             if storage_root.exists():
                 self.download_root = storage_root / "Music" / "SpotifyDownloads"
-                self.temp_dir = storage_root / "Download" / "temp_spotify"
             else:
                 # Fallback to Termux home
-                home = Path.home()
-                self.download_root = home / "storage" / "music" / "SpotifyDownloads"
-                self.temp_dir = home / "downloads" / "temp_spotify"
+                self.download_root = Path.home() / "storage" / "music" / "SpotifyDownloads"
+            self.temp_dir = self.download_root / ".tmp"
         else:
             # Standard paths for other systems
             self.download_root = self.script_root / "downloads"
@@ -133,22 +212,17 @@ class TermuxSpotifyDownloader:
     def check_storage_space(self):
         """Check available storage space"""
         try:
-            if self.is_termux:
-                # Use Android storage stats
-                result = subprocess.run(['df', '-h', str(self.download_root.parent)], 
-                                      capture_output=True, text=True)
-                if result.returncode == 0:
-                    lines = result.stdout.strip().split('\n')
-                    if len(lines) > 1:
-                        parts = lines[1].split()
-                        available = parts[3] if len(parts) > 3 else "Unknown"
-                        print(f"💾 Available storage: {available}")
-            else:
-                # Use psutil for other systems
+            if os.name == 'nt':
+                # statvfs doesn't exist on Windows
                 usage = psutil.disk_usage(str(self.download_root))
                 available_gb = usage.free / (1024**3)
-                print(f"💾 Available storage: {available_gb:.1f} GB")
-                
+            else:
+                # Single syscall - no df fork/exec or text parsing
+                st = os.statvfs(str(self.download_root))
+                available_gb = (st.f_bavail * st.f_frsize) / (1024**3)
+
+            print(f"💾 Available storage: {available_gb:.1f} GB")
+
         except Exception as e:
             print(f"⚠️  Could not check storage space: {e}")
     
@@ -162,7 +236,12 @@ class TermuxSpotifyDownloader:
         # Add mobile-specific optimizations
         if self.is_termux:
             self.ydl_opts.update(self.mobile_optimizer.get_mobile_ytdl_opts())
-        
+
+        # Persistent cache so the player-JS/signature work survives across
+        # tracks and runs instead of being redone every time (kept off the
+        # slow /storage mount on purpose)
+        self.ydl_opts['cachedir'] = str(self.script_root / '.ytdlp_cache')
+
         print("🎧 YouTube downloader configured for maximum quality")
     
     def setup_mobile_features(self):
@@ -179,20 +258,18 @@ class TermuxSpotifyDownloader:
             
             print("📱 Mobile features initialized")
     
-    def extract_playlist_id(self, playlist_url):
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def extract_playlist_id(playlist_url):
         """Extract playlist ID from various Spotify URL formats"""
-        # Handle different URL formats
-        if 'open.spotify.com' in playlist_url:
-            if '/playlist/' in playlist_url:
-                return playlist_url.split('/playlist/')[-1].split('?')[0]
-        
-        if playlist_url.startswith('spotify:playlist:'):
-            return playlist_url.split('spotify:playlist:')[-1]
-        
+        match = _PLAYLIST_RE.search(playlist_url)
+        if match:
+            return match.group(1)
+
         # Direct playlist ID
-        if len(playlist_url) == 22 and playlist_url.replace('-', '').replace('_', '').isalnum():
+        if _PLAYLIST_ID_RE.match(playlist_url):
             return playlist_url
-            
+
         raise ValueError("Invalid Spotify playlist URL format")
     
     def get_playlist_tracks(self, playlist_url):
@@ -201,35 +278,79 @@ class TermuxSpotifyDownloader:
             playlist_id = self.extract_playlist_id(playlist_url)
             print(f"📋 Fetching playlist: {playlist_id}")
             
-            # Get playlist info
-            playlist = self.spotify.playlist(playlist_id)
+            # Get playlist info (snapshot_id changes whenever the playlist
+            # does, so it doubles as the cache key for reruns)
+            playlist = self.spotify.playlist(
+                playlist_id, fields='name,description,owner.display_name,snapshot_id')
             playlist_name = playlist['name']
             playlist_description = playlist.get('description', '')
-            
+            snapshot_id = playlist.get('snapshot_id', '')
+
+            cache_path = self.temp_dir / f"{playlist_id}_{snapshot_id}.json"
+            if cache_path.exists():
+                try:
+                    raw = cache_path.read_bytes()
+                    cached = orjson.loads(raw) if orjson else json.loads(raw)
+                    print(f"⚡ Using cached playlist metadata ({len(cached['tracks'])} tracks)")
+                    return cached['info'], cached['tracks']
+                except Exception:
+                    pass  # Corrupt cache - just refetch
+
             print(f"📋 Playlist: {playlist_name}")
             print(f"👤 Owner: {playlist['owner']['display_name']}")
             
-            # Get all tracks with pagination
+            # Get all tracks with pagination (limit=100 is the API maximum;
+            # the fields filter trims the payload to just what we read)
+            track_fields = (
+                'items(track(type,name,track_number,disc_number,duration_ms,'
+                'popularity,explicit,preview_url,external_ids.isrc,'
+                'external_urls.spotify,artists(id,name),'
+                'album(name,release_date,images,artists(name)))),next,total'
+            )
             tracks = []
-            results = self.spotify.playlist_tracks(playlist_id, limit=50)
+            results = self.spotify.playlist_tracks(playlist_id, limit=100,
+                                                   fields=track_fields)
             tracks.extend(results['items'])
-            
-            while results['next']:
-                results = self.spotify.next(results)
-                tracks.extend(results['items'])
+
+            # The first page reports the total, so the remaining offsets are
+            # known up front - fetch them in parallel over the pooled session
+            # instead of walking the next links one round trip at a time
+            total = results.get('total') or len(tracks)
+            offsets = range(100, total, 100)
+            if offsets:
+                def fetch_page(offset):
+                    return self.spotify.playlist_tracks(
+                        playlist_id, limit=100, offset=offset, fields=track_fields)
+
+                try:
+                    with ThreadPoolExecutor(max_workers=4) as pool:
+                        for page in pool.map(fetch_page, offsets):
+                            tracks.extend(page['items'])
+                except Exception as e:
+                    # Rate limited or similar - retry the slow, safe way
+                    print(f"⚠️  Parallel page fetch failed ({e}), fetching sequentially")
+                    tracks = tracks[:100]
+                    while results['next']:
+                        results = self.spotify.next(results)
+                        tracks.extend(results['items'])
             
             # Process tracks with detailed metadata
             track_list = []
             for i, item in enumerate(tracks, 1):
                 if item['track'] and item['track']['type'] == 'track':
                     track = item['track']
-                    
+
+                    # Compute the joined artist strings once - they feed
+                    # several fields below
+                    artist_names = [artist['name'] for artist in track['artists']]
+                    artists_joined = ', '.join(artist_names)
+
                     # Get album artwork URL (highest resolution)
                     album_cover_url = None
                     if track['album'].get('images'):
-                        album_cover_url = max(track['album']['images'], 
-                                            key=lambda x: x.get('width', 0))['url']
-                    
+                        album_cover_url = max(track['album']['images'],
+                                              key=itemgetter('width'))['url']
+
                     # Parse release date
                     release_date = track['album'].get('release_date', '')
                     release_year = None
@@ -242,9 +363,9 @@ class TermuxSpotifyDownloader:
                     track_info = {
                         'index': i,
                         'name': track['name'],
-                        'artists': [artist['name'] for artist in track['artists']],
+                        'artists': artist_names,
                         'album': track['album']['name'],
-                        'album_artist': track['album']['artists'][0]['name'] if track['album']['artists'] else track['artists'][0]['name'],
+                        'album_artist': track['album']['artists'][0]['name'] if track['album']['artists'] else artist_names[0],
                         'track_number': track['track_number'],
                         'disc_number': track.get('disc_number', 1),
                         'duration_ms': track['duration_ms'],
@@ -255,22 +376,31 @@ class TermuxSpotifyDownloader:
                         'popularity': track.get('popularity', 0),
                         'explicit': track.get('explicit', False),
                         'preview_url': track.get('preview_url'),
-                        'search_query': f"{', '.join([artist['name'] for artist in track['artists']])} - {track['name']}",
-                        'spotify_url': track['external_urls']['spotify']
+                        'search_query': f"{artists_joined} - {track['name']}",
+                        'spotify_url': track['external_urls']['spotify'],
+                        'genres': [],
+                        '_artist_id': track['artists'][0]['id'] if track['artists'] else None
                     }
-                    
-                    # Get additional artist metadata
-                    try:
-                        artist_info = self.spotify.artist(track['artists'][0]['id'])
-                        track_info['genres'] = artist_info.get('genres', [])[:3]
-                    except:
-                        track_info['genres'] = []
-                    
+
                     track_list.append(track_info)
-                    
+
                     if i % 10 == 0:
                         print(f"📝 Processed {i}/{len(tracks)} tracks...")
-            
+
+            # Batch the genre lookups: artists() takes up to 50 IDs per call
+            genre_map = {}
+            artist_ids = list({t['_artist_id'] for t in track_list if t['_artist_id']})
+            for start in range(0, len(artist_ids), 50):
+                try:
+                    response = self.spotify.artists(artist_ids[start:start + 50])
+                    genre_map.update({a['id']: a.get('genres', [])[:3]
+                                      for a in response['artists'] if a})
+                except:
+                    pass
+
+            for track_info in track_list:
+                track_info['genres'] = genre_map.get(track_info.pop('_artist_id'), [])
+
             print(f"✅ Found {len(track_list)} tracks")
             
             playlist_info = {
@@ -280,7 +410,15 @@ class TermuxSpotifyDownloader:
                 'total_tracks': len(track_list),
                 'playlist_id': playlist_id
             }
-            
+
+            # Cache to disk so retries/reruns skip all Spotify round trips
+            try:
+                payload = {'info': playlist_info, 'tracks': track_list}
+                data = orjson.dumps(payload) if orjson else json.dumps(payload).encode()
+                cache_path.write_bytes(data)
+            except Exception:
+                pass
+
             return playlist_info, track_list
             
         except Exception as e:
@@ -289,42 +427,69 @@ class TermuxSpotifyDownloader:
     
     def sanitize_filename(self, filename):
         """Create safe filename for mobile storage"""
-        # Remove invalid characters
-        invalid_chars = '<>:"/\\|?*'
-        for char in invalid_chars:
-            filename = filename.replace(char, '')
-        
-        # Replace multiple spaces with single space
-        filename = re.sub(r'\s+', ' ', filename).strip()
-        
-        # Limit length for mobile compatibility
-        max_length = 150 if self.is_termux else 200
-        if len(filename) > max_length:
-            filename = filename[:max_length]
-        
+        # Strip invalid characters and collapse whitespace in one pass
+        filename = self._WS_RE.sub(' ', filename.translate(self._SANITIZE_TABLE)).strip()
+
+        # Limit length for mobile compatibility - trimmed in encoded bytes,
+        # since Android filesystems cap name components at 255 bytes and
+        # CJK/emoji titles blow straight past a character-count guard
+        max_bytes = 150 if self.is_termux else 200
+        encoded = filename.encode('utf-8')
+        if len(encoded) > max_bytes:
+            # errors='ignore' drops any multibyte char cut at the boundary
+            filename = encoded[:max_bytes].decode('utf-8', 'ignore').rstrip()
+
         return filename
     
     def download_album_artwork(self, url, file_path):
         """Download and optimize album artwork for mobile"""
         try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            
-            with open(file_path, 'wb') as f:
-                f.write(response.content)
-            
-            # Optimize for mobile storage
+            # Stream straight to disk - no full buffer in RAM
+            with self.http.get(url, stream=True, timeout=30) as response:
+                response.raise_for_status()
+                # Make urllib3 undo any transfer encoding before it hits disk
+                response.raw.decode_content = True
+                with open(file_path, 'wb', buffering=65536) as f:
+                    shutil.copyfileobj(response.raw, f, 65536)
+
+            # Optimize for mobile storage - but Spotify covers are usually
+            # 640x640 JPEGs already, so skip the decode+re-encode for those
             if self.is_termux:
-                self.mobile_optimizer.optimize_image(file_path)
-            
+                with Image.open(file_path) as img:
+                    needs_reencode = (img.format != 'JPEG'
+                                      or max(img.size) > 800)
+                if needs_reencode:
+                    if pyvips:
+                        # libvips reads the source lazily while writing -
+                        # writing over the same path truncates the file
+                        # mid-read, so go through a sibling temp file
+                        tmp_path = Path(file_path).with_suffix('.tmp.jpg')
+                        img = pyvips.Image.thumbnail(str(file_path), 800, height=800)
+                        img.write_to_file(str(tmp_path), Q=90, strip=True)
+                        os.replace(tmp_path, file_path)
+                    else:
+                        self.mobile_optimizer.optimize_image(file_path)
+
             return True
             
         except Exception as e:
             print(f"⚠️  Could not download artwork: {e}")
             return False
     
+    def _scan_existing(self, playlist_dir):
+        """Enumerate existing download stems in one os.scandir pass"""
+        if not playlist_dir.exists():
+            return set()
+        with os.scandir(playlist_dir) as entries:
+            return {Path(entry.name).stem for entry in entries if entry.is_file()}
+
     def search_and_download(self, track_info, playlist_name):
         """Search and download track with mobile optimizations"""
+        # Queued futures still run during executor shutdown after Ctrl-C -
+        # bail out immediately so an interrupt actually stops the run
+        if not self.is_downloading:
+            return False
+
         search_query = track_info['search_query']
         safe_filename = self.sanitize_filename(search_query)
         
@@ -332,9 +497,11 @@ class TermuxSpotifyDownloader:
         playlist_dir = self.download_root / self.sanitize_filename(playlist_name)
         playlist_dir.mkdir(exist_ok=True)
         
-        # Check if file already exists
-        existing_files = list(playlist_dir.glob(f"{safe_filename}.*"))
-        if existing_files:
+        # Check if file already exists (stems scanned once per playlist -
+        # per-track globs were O(N^2) on Android's slow FUSE storage) or
+        # was already completed per the ID manifest
+        track_id = track_info.get('spotify_url', '').rsplit('/', 1)[-1]
+        if track_id in self.completed_ids or safe_filename in self._existing_stems:
             print(f"⏭️  Skipping (already exists): {safe_filename}")
             return True
         
@@ -347,54 +514,50 @@ class TermuxSpotifyDownloader:
         print(f"🔍 Searching: {search_query}")
         
         try:
-            # Configure output path
+            # Configure output path on a per-call copy - the shared ydl_opts
+            # must not be mutated when several workers run at once
             temp_output = str(self.temp_dir / f"{safe_filename}.%(ext)s")
-            self.ydl_opts['outtmpl'] = temp_output
-            
-            # Download with progress hook
-            def progress_hook(d):
-                if d['status'] == 'downloading':
-                    if 'total_bytes' in d:
-                        percent = (d['downloaded_bytes'] / d['total_bytes']) * 100
-                        print(f"\r📥 Downloading: {percent:.1f}%", end='', flush=True)
-                elif d['status'] == 'finished':
-                    print(f"\n✅ Downloaded: {Path(d['filename']).name}")
-            
-            self.ydl_opts['progress_hooks'] = [progress_hook]
-            
-            # Search and download
-            with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                try:
-                    # Search for best match
-                    info = ydl.extract_info(f"ytsearch1:{search_query}", download=False)
-                    if not info['entries']:
-                        print(f"❌ No results found for: {search_query}")
+
+            ydl_opts = {**self.ydl_opts, 'outtmpl': temp_output}
+
+            # Search and download in one extractor pass - a separate
+            # download=False probe re-resolves the URL and re-runs the
+            # signature cipher for nothing. Duration matching happens
+            # inside the same call via match_filter, so a grossly wrong
+            # result is rejected before a single byte is downloaded;
+            # retry once with a relaxed window (live versions etc.)
+            expected_duration = track_info['duration_ms'] / 1000
+            temp_files = []
+            for window in (30, 60):
+                ydl_opts['match_filter'] = yt_dlp.utils.match_filter_func(
+                    f"duration >= {expected_duration - window:.0f} & "
+                    f"duration <= {expected_duration + window:.0f}")
+
+                self.youtube_limiter.acquire()
+                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    try:
+                        info = ydl.extract_info(f"ytsearch1:{search_query}", download=True)
+                        if not info['entries']:
+                            print(f"❌ No results found for: {search_query}")
+                            return False
+
+                        video_info = info['entries'][0]
+                        print(f"🎯 Found: {video_info.get('title', 'Unknown')}")
+
+                    except Exception as e:
+                        print(f"❌ Download failed: {e}")
                         return False
-                    
-                    video_info = info['entries'][0]
-                    video_title = video_info.get('title', 'Unknown')
-                    duration = video_info.get('duration', 0)
-                    
-                    # Verify duration similarity (within 30 seconds)
-                    expected_duration = track_info['duration_ms'] / 1000
-                    if abs(duration - expected_duration) > 30:
-                        print(f"⚠️  Duration mismatch: Expected {expected_duration:.0f}s, got {duration:.0f}s")
-                    
-                    print(f"🎯 Found: {video_title}")
-                    
-                    # Download the video
-                    ydl.download([video_info['webpage_url']])
-                    
-                except Exception as e:
-                    print(f"❌ Download failed: {e}")
-                    return False
-            
-            # Find downloaded file
-            temp_files = list(self.temp_dir.glob(f"{safe_filename}.*"))
+
+                # Filtered-out results leave no file behind
+                temp_files = list(self.temp_dir.glob(f"{safe_filename}.*"))
+                if temp_files:
+                    break
+                print(f"⚠️  No result within ±{window}s of {expected_duration:.0f}s, relaxing filter")
+
             if not temp_files:
                 print(f"❌ Download file not found: {safe_filename}")
                 return False
-            
+
             downloaded_file = temp_files[0]
             
             # Download album artwork
@@ -403,16 +566,18 @@ class TermuxSpotifyDownloader:
                 artwork_path = self.temp_dir / f"{safe_filename}_artwork.jpg"
                 self.download_album_artwork(track_info['album_cover_url'], artwork_path)
             
-            # Add metadata using audio manager
-            success = self.audio_manager.embed_metadata(
-                downloaded_file, track_info, artwork_path
+            # Keep codecs players handle natively as-is; anything else
+            # (webm etc.) gets converted by the single ffmpeg pass below
+            ext = downloaded_file.suffix.lower()
+            final_ext = ext if ext in ('.mp3', '.opus', '.m4a', '.flac') else '.mp3'
+
+            # Tag, attach artwork and move in a single ffmpeg pass
+            final_file = playlist_dir / f"{safe_filename}{final_ext}"
+            success = self.audio_manager.finalize_with_ffmpeg(
+                downloaded_file, final_file, track_info, artwork_path
             )
-            
+
             if success:
-                # Move to final location
-                final_file = playlist_dir / f"{safe_filename}.mp3"
-                downloaded_file.rename(final_file)
-                
                 # Cleanup temp files
                 if artwork_path and artwork_path.exists():
                     artwork_path.unlink()
@@ -424,6 +589,11 @@ class TermuxSpotifyDownloader:
                         f"By {', '.join(track_info['artists'])}"
                     )
                 
+                self._existing_stems.add(safe_filename)
+                if track_id:
+                    self.completed_ids.add(track_id)
+                    if self._manifest_fh:
+                        self._manifest_fh.write(track_id + '\n')
                 print(f"✅ Completed: {safe_filename}")
                 return True
             else:
@@ -434,56 +604,115 @@ class TermuxSpotifyDownloader:
             print(f"❌ Error downloading {search_query}: {e}")
             return False
     
-    def download_playlist(self, playlist_url, max_concurrent=2):
+    def download_playlist(self, playlist_url, max_concurrent=8):
         """Download entire playlist with mobile-optimized concurrency"""
         print(f"\n🎵 Starting playlist download...")
-        
+
         # Get playlist information
         playlist_info, tracks = self.get_playlist_tracks(playlist_url)
         if not tracks:
             print("❌ No tracks found or error occurred")
             return
-        
+
         print(f"\n📋 Playlist: {playlist_info['name']}")
         print(f"📊 Total tracks: {len(tracks)}")
-        
-        # Adjust concurrency for mobile
+
+        # One directory scan up front instead of a glob per track
+        playlist_dir = self.download_root / self.sanitize_filename(playlist_info['name'])
+        playlist_dir.mkdir(parents=True, exist_ok=True)
+        self._existing_stems = self._scan_existing(playlist_dir)
+
+        # ID-based manifest: 22 bytes per finished track, and it keeps
+        # skipping correctly even if someone renames the files
+        manifest_path = playlist_dir / '.manifest'
+        self.completed_ids = (set(manifest_path.read_text().split())
+                              if manifest_path.exists() else set())
+        self._manifest_fh = open(manifest_path, 'a', buffering=1)
+
+        # Append-only resume log: one JSON line per finished track, so
+        # recording progress is O(1) instead of rewriting a growing list.
+        # Scoped per playlist (like the snapshot cache) - a shared log
+        # would false-skip tracks that appear in more than one playlist
+        state_path = self.temp_dir / f"{playlist_info['playlist_id']}_state.jsonl"
+        if state_path.exists():
+            try:
+                with open(state_path, 'rb') as f:
+                    for line in f:
+                        entry = orjson.loads(line) if orjson else json.loads(line)
+                        self._existing_stems.add(self.sanitize_filename(entry['name']))
+            except Exception:
+                pass
+        self._state_fp = open(state_path, 'ab', buffering=65536)
+
+        # Failures append one JSON line each as they happen - no full-list
+        # rewrite per failure, and a crash loses nothing already logged
+        self._failed_fh = open(self.download_root / "failed_downloads.jsonl",
+                               'ab', buffering=0)
+
+        # Adjust concurrency for mobile - a few workers saturate a typical
+        # mobile link without exhausting memory
         if self.is_termux:
-            max_concurrent = min(max_concurrent, 1)  # Single thread for mobile
-        
-        # Download tracks
+            max_concurrent = min(max_concurrent, 3)
+
+        # Download tracks concurrently; the pipeline is network-bound
         self.is_downloading = True
         successful = 0
         failed = 0
-        
+
         start_time = time.time()
-        
-        for i, track in enumerate(tracks, 1):
-            if not self.is_downloading:  # Check for interruption
-                break
-                
-            print(f"\n[{i}/{len(tracks)}] Processing: {track['search_query']}")
-            
-            success = self.search_and_download(track, playlist_info['name'])
-            
-            if success:
-                successful += 1
-                self.completed_downloads.append(track)
-            else:
-                failed += 1
-                self.failed_downloads.append(track)
-            
-            # Mobile optimization: Brief pause between downloads
-            if self.is_termux and i < len(tracks):
-                time.sleep(1)
-            
-            # Progress update
-            elapsed = time.time() - start_time
-            avg_time = elapsed / i
-            eta = avg_time * (len(tracks) - i)
-            
-            print(f"📊 Progress: {i}/{len(tracks)} | ✅ {successful} | ❌ {failed} | ETA: {eta/60:.1f}m")
-        
+
+        with ThreadPoolExecutor(max_workers=max_concurrent) as executor:
+            futures = {
+                executor.submit(self.search_and_download, track, playlist_info['name']): track
+                for track in tracks
+            }
+
+            with tqdm(total=len(tracks), desc="Downloading", unit="track") as pbar:
+                for future in as_completed(futures):
+                    track = futures[future]
+                    try:
+                        success = future.result()
+                    except Exception as e:
+                        print(f"❌ Error downloading {track['search_query']}: {e}")
+                        success = False
+
+                    with self._downloads_lock:
+                        if success:
+                            successful += 1
+                            self.completed_downloads.append(track)
+                            entry = {'index': track['index'], 'name': track['search_query']}
+                            line = orjson.dumps(entry) if orjson else json.dumps(entry).encode()
+                            self._state_fp.write(line + b'\n')
+                            self._state_fp.flush()
+                        else:
+                            failed += 1
+                            self.failed_downloads.append(track)
+                            line = (orjson.dumps(track) if orjson
+                                    else json.dumps(track, separators=(',', ':')).encode())
+                            self._failed_fh.write(line + b'\n')
+
+                    pbar.set_postfix({'track': track['name'][:20]})
+                    pbar.update(1)
+
+                    # Storage check every 25 tracks - per-track statvfs is
+                    # needless syscall pressure and the number barely moves
+                    done_count = successful + failed
+                    if done_count % 25 == 0 and os.name != 'nt':
+                        st = os.statvfs(str(self.download_root))
+                        self._cached_free_bytes = st.f_bavail * st.f_frsize
+                        if self._cached_free_bytes < 500 * 1024 * 1024:
+                            print("⚠️  Less than 500MB free - stopping downloads")
+                            for pending in futures:
+                                pending.cancel()
+                            break
+
+        self._state_fp.close()
+        self._state_fp = None
+        self._failed_fh.close()
+        self._failed_fh = None
+        self._manifest_fh.close()
+        self._manifest_fh = None
+
         # Final summary
         total_time = time.time() - start_time
         print(f"\n🎉 Download completed!")
@@ -498,34 +727,34 @@ class TermuxSpotifyDownloader:
                 f"{successful}/{len(tracks)} tracks downloaded"
             )
         
-        # Save failed downloads for retry
+        # Failures were appended to the log as they happened
         if self.failed_downloads:
-            failed_file = self.download_root / "failed_downloads.json"
-            with open(failed_file, 'w') as f:
-                json.dump(self.failed_downloads, f, indent=2)
-            print(f"💾 Failed downloads saved to: {failed_file}")
+            print(f"💾 Failed downloads saved to: {self.download_root / 'failed_downloads.jsonl'}")
     
     def retry_failed_downloads(self):
         """Retry failed downloads from previous session"""
-        failed_file = self.download_root / "failed_downloads.json"
-        
+        failed_file = self.download_root / "failed_downloads.jsonl"
+
         if not failed_file.exists():
             print("📝 No failed downloads file found")
             return
-        
+
         try:
-            with open(failed_file, 'r') as f:
-                failed_tracks = json.load(f)
-            
+            loads = orjson.loads if orjson else json.loads
+            with open(failed_file, 'rb') as f:
+                failed_tracks = [loads(line) for line in f if line.strip()]
+
             if not failed_tracks:
                 print("📝 No failed downloads to retry")
                 return
             
             print(f"🔄 Retrying {len(failed_tracks)} failed downloads...")
-            
+
+            self._existing_stems = self._scan_existing(self.download_root / "RetryDownloads")
             self.failed_downloads = []
+            self.is_downloading = True
             successful = 0
-            
+
             for track in failed_tracks:
                 print(f"\n🔄 Retrying: {track['search_query']}")
                 success = self.search_and_download(track, "RetryDownloads")
@@ -537,9 +766,12 @@ class TermuxSpotifyDownloader:
             
             print(f"\n🔄 Retry completed: {successful}/{len(failed_tracks)} successful")
             
-            # Update failed downloads file
-            with open(failed_file, 'w') as f:
-                json.dump(self.failed_downloads, f, indent=2)
+            # One rewrite at the end with whatever still failed
+            with open(failed_file, 'wb') as f:
+                for track in self.failed_downloads:
+                    line = (orjson.dumps(track) if orjson
+                            else json.dumps(track, separators=(',', ':')).encode())
+                    f.write(line + b'\n')
                 
         except Exception as e:
             print(f"❌ Error retrying downloads: {e}")
@@ -548,13 +780,12 @@ class TermuxSpotifyDownloader:
         """Handle graceful shutdown"""
         print(f"\n⚠️  Received signal {signum}, shutting down gracefully...")
         self.is_downloading = False
-        
-        if self.failed_downloads:
-            failed_file = self.download_root / "failed_downloads.json"
-            with open(failed_file, 'w') as f:
-                json.dump(self.failed_downloads, f, indent=2)
-            print(f"💾 Saved failed downloads to: {failed_file}")
-        
+
+        # Failures are already on disk in the append-only log - just flush
+        if self._failed_fh:
+            self._failed_fh.flush()
+            print(f"💾 Failed downloads logged to: {self.download_root / 'failed_downloads.jsonl'}")
+
         sys.exit(0)
     
     def interactive_mode(self):
@@ -5,6 +5,7 @@ Tests the maximum quality features of the Spotify downloader
 """
 
 import sys
+import heapq
 import yt_dlp
 from main import TermuxSpotifyDownloader
 
@@ -35,31 +36,38 @@ def test_audio_formats():
                 print(f"🎵 Test Video: {video_info.get('title', 'Unknown')}")
                 print(f"📺 Duration: {video_info.get('duration', 0)} seconds")
                 
-                # Get available formats
+                # Get the top audio-only formats - nlargest takes the ten
+                # we show without materializing and sorting the full list
                 formats = video_info.get('formats', [])
-                audio_formats = [f for f in formats if f.get('acodec') != 'none' and f.get('vcodec') == 'none']
-                
+                audio_formats = heapq.nlargest(
+                    10,
+                    (f for f in formats
+                     if f.get('acodec') != 'none' and f.get('vcodec') == 'none'),
+                    key=lambda x: x.get('abr') or 0)
+
                 if not audio_formats:
                     print("❌ No audio-only formats found")
                     return
-                
-                print(f"\n🎧 Available Audio Formats ({len(audio_formats)} found):")
+
+                print(f"\n🎧 Available Audio Formats (top {len(audio_formats)}):")
                 print("-" * 70)
-                
-                # Sort by quality (bitrate)
-                audio_formats.sort(key=lambda x: x.get('abr', 0) or 0, reverse=True)
-                
-                for i, fmt in enumerate(audio_formats[:10]):  # Show top 10
+
+                # One write for the whole table - ten separate prints each
+                # flush to the (slow, on Termux) terminal
+                rows = []
+                for i, fmt in enumerate(audio_formats):
                     codec = fmt.get('acodec', 'unknown')
                     bitrate = fmt.get('abr', 'unknown')
                     ext = fmt.get('ext', 'unknown')
                     filesize = fmt.get('filesize') or fmt.get('filesize_approx', 0)
-                    
-                    size_mb = f"{filesize / 1024 / 1024:.1f}MB" if filesize else "unknown"
-                    
+
+                    size_mb = f"{filesize / 1048576:.1f}MB" if filesize else "unknown"
+
                     quality = "🔥 HIGHEST" if i == 0 else f"#{i+1}"
-                    
-                    print(f"{quality:10} | {codec:8} | {bitrate:>3} kbps | {ext:4} | {size_mb:>8}")
+
+                    rows.append(f"{quality:10} | {codec:8} | {bitrate:>3} kbps | {ext:4} | {size_mb:>8}")
+
+                sys.stdout.write('\n'.join(rows) + '\n')
                 
                 # Test our format selector
                 print(f"\n🎯 Testing Our Format Selector:")
@@ -70,8 +78,10 @@ def test_audio_formats():
                 
                 with yt_dlp.YoutubeDL(test_opts) as test_ydl:
                     try:
-                        # Simulate format selection
-                        selected = test_ydl.extract_info(video_info['webpage_url'], download=False)
+                        # Run format selection on the info we already have -
+                        # a second extract_info would re-fetch the player JS
+                        # and re-solve signatures for the same video
+                        selected = test_ydl.process_ie_result(dict(video_info), download=False)
                         requested_formats = selected.get('requested_formats', [])
                         
                         if requested_formats:
@@ -85,14 +95,17 @@ def test_audio_formats():
                             ext = selected.get('ext', 'unknown')
                             print(f"✅ Selected Format: {codec} ({ext}) at {bitrate} kbps")
                             
-                            # Analyze quality
-                            if 'flac' in codec.lower():
+                            # Analyze quality - lowercase and parse the
+                            # bitrate once instead of per elif arm
+                            codec_l = codec.lower()
+                            br = int(bitrate) if bitrate not in (None, 'unknown') else 0
+                            if 'flac' in codec_l:
                                 print("🏆 EXCELLENT: Lossless FLAC format selected!")
-                            elif 'opus' in codec.lower():
+                            elif 'opus' in codec_l:
                                 print("⭐ GREAT: High-efficiency Opus format selected!")
-                            elif 'aac' in codec.lower() and (bitrate == 'unknown' or int(bitrate or 0) >= 256):
+                            elif 'aac' in codec_l and (not br or br >= 256):
                                 print("👍 GOOD: High-quality AAC format selected!")
-                            elif 'mp3' in codec.lower() and (bitrate == 'unknown' or int(bitrate or 0) >= 320):
+                            elif 'mp3' in codec_l and (not br or br >= 320):
                                 print("👌 GOOD: High-quality MP3 format selected!")
                             else:
                                 print(f"⚠️  ACCEPTABLE: {codec} format selected")
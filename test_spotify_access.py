@@ -3,8 +3,10 @@
 Test script to verify Spotify access and find working playlists
 """
 import spotipy
+from spotipy.cache_handler import CacheFileHandler
 from spotipy.oauth2 import SpotifyClientCredentials
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 
 def test_spotify_connection():
@@ -17,9 +19,12 @@ def test_spotify_connection():
         return None
         
     try:
+        # Persist the access token between runs - it lives for an hour,
+        # so most invocations skip the token POST entirely
         client_credentials_manager = SpotifyClientCredentials(
-            client_id=client_id, 
-            client_secret=client_secret
+            client_id=client_id,
+            client_secret=client_secret,
+            cache_handler=CacheFileHandler(cache_path='.spotipy_token_cache')
         )
         sp = spotipy.Spotify(client_credentials_manager=client_credentials_manager)
         
@@ -50,37 +55,51 @@ def find_public_playlists(sp):
     ]
     
     working_playlists = []
-    
-    for term in search_terms:
-        try:
-            results = sp.search(q=f'"{term}"', type='playlist', limit=10)
-            if results and 'playlists' in results and results['playlists']['items']:
-                for playlist in results['playlists']['items']:
-                    if playlist and 'id' in playlist:
-                        playlist_id = playlist['id']
-                        try:
-                            # Test access
-                            test_playlist = sp.playlist(playlist_id, fields="name,tracks.total,owner.display_name")
-                            if test_playlist['tracks']['total'] > 0:
-                                working_playlists.append({
-                                    'name': test_playlist['name'],
-                                    'id': playlist_id,
-                                    'tracks': test_playlist['tracks']['total'],
-                                    'owner': test_playlist.get('owner', {}).get('display_name', 'Unknown'),
-                                    'url': f"https://open.spotify.com/playlist/{playlist_id}"
-                                })
-                                print(f"✅ {test_playlist['name']} ({test_playlist['tracks']['total']} tracks)")
-                                
-                                if len(working_playlists) >= 3:  # Found enough
-                                    return working_playlists
-                                    
-                        except Exception as e:
-                            continue  # Skip inaccessible playlists
-                            
-        except Exception as e:
-            print(f"⚠️  Search failed for '{term}': {str(e)[:50]}...")
-            continue
-    
+
+    # The searches run concurrently, and the search payload already
+    # carries name, owner and tracks.total - re-fetching each playlist
+    # just to read those back was a wasted round trip per candidate
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        search_futures = {
+            pool.submit(sp.search, q=f'"{term}"', type='playlist', limit=10): term
+            for term in search_terms
+        }
+
+        seen = set()
+        for future in as_completed(search_futures):
+            term = search_futures[future]
+            try:
+                results = future.result()
+            except Exception as e:
+                print(f"⚠️  Search failed for '{term}': {str(e)[:50]}...")
+                continue
+
+            if not (results and 'playlists' in results and results['playlists']['items']):
+                continue
+
+            for playlist in results['playlists']['items']:
+                if not playlist or 'id' not in playlist or playlist['id'] in seen:
+                    continue
+                seen.add(playlist['id'])
+
+                total = (playlist.get('tracks') or {}).get('total', 0)
+                if total <= 0:
+                    continue
+
+                working_playlists.append({
+                    'name': playlist.get('name', 'Unknown'),
+                    'id': playlist['id'],
+                    'tracks': total,
+                    'owner': (playlist.get('owner') or {}).get('display_name', 'Unknown'),
+                    'url': f"https://open.spotify.com/playlist/{playlist['id']}"
+                })
+                print(f"✅ {playlist.get('name', 'Unknown')} ({total} tracks)")
+
+                if len(working_playlists) >= 3:  # Found enough
+                    for pending in search_futures:
+                        pending.cancel()
+                    return working_playlists
+
     return working_playlists
 
 if __name__ == "__main__":
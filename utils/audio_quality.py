@@ -2,53 +2,125 @@
 Audio quality management and metadata handling
 """
 
+import base64
 import os
+import shutil
 import subprocess
+from collections import OrderedDict
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import mutagen
 from mutagen.mp3 import MP3
 from mutagen.id3 import ID3, APIC, TIT2, TPE1, TALB, TPE2, TRCK, TPOS, TDRC, TCON, COMM
 from mutagen.flac import FLAC
+from mutagen.mp4 import MP4, MP4Cover
+from mutagen.oggvorbis import OggVorbis
+from mutagen.oggopus import OggOpus
 import requests
 from PIL import Image
 
+# Format selection - prioritize FLAC, then high-quality MP3. Built once;
+# every per-track YoutubeDL instance shares the same spec string.
+_FORMAT_SELECTOR = (
+    # Best FLAC audio available
+    'bestaudio[acodec=flac]/bestaudio[ext=flac]/'
+    # Best Opus/WebM audio (often highest quality)
+    'bestaudio[acodec=opus]/bestaudio[ext=webm]/'
+    # High quality M4A
+    'bestaudio[acodec=aac][abr>=256]/bestaudio[ext=m4a][abr>=256]/'
+    # High quality MP3
+    'bestaudio[acodec=mp3][abr>=320]/bestaudio[ext=mp3][abr>=320]/'
+    # Fallback to best available
+    'bestaudio/best'
+)
+
+# Known extensions load through their parser directly; mutagen.File's
+# sniffing tries every format against the header until one sticks
+_TAG_LOADERS = {
+    '.mp3': MP3,
+    '.flac': FLAC,
+    '.m4a': MP4,
+    '.mp4': MP4,
+    '.ogg': OggVorbis,
+    '.opus': OggOpus,
+}
+
+def _load_audio(audio_file):
+    """Load an audio file with mutagen, dispatching on extension"""
+    loader = _TAG_LOADERS.get(Path(audio_file).suffix.lower())
+    if loader is None:
+        return mutagen.File(audio_file)
+    try:
+        return loader(audio_file)
+    except Exception:
+        # Misnamed file - fall back to sniffing
+        return mutagen.File(audio_file)
+
 class AudioQualityManager:
     def __init__(self):
         self.supported_formats = ['mp3', 'flac', 'm4a', 'ogg']
         self.preferred_quality = 'best'
+        # Tracks from the same album share one cover - cache the bytes
+        # per album so only the first track reads it from disk (LRU,
+        # keyed by cover URL so same-titled albums can't collide)
+        self._artwork_cache = OrderedDict()
+        self._artwork_cache_max = 64
+        # Every format we can tag natively - anything not in here falls
+        # back to the MP3 conversion path
+        self._embed_dispatch = {
+            '.mp3': self._embed_mp3_metadata,
+            '.flac': self._embed_flac_metadata,
+            '.m4a': self._embed_m4a_metadata,
+            '.mp4': self._embed_m4a_metadata,
+            '.ogg': self._embed_ogg_metadata,
+            '.opus': self._embed_ogg_metadata,
+        }
     
-    def get_optimal_ytdl_config(self, temp_dir, is_mobile=False):
-        """Get optimized yt-dlp configuration for maximum audio quality"""
-        
-        # Format selection - prioritize FLAC, then high-quality MP3
-        format_selector = (
-            # Best FLAC audio available
-            'bestaudio[acodec=flac]/bestaudio[ext=flac]/'
-            # Best Opus/WebM audio (often highest quality)
-            'bestaudio[acodec=opus]/bestaudio[ext=webm]/'
-            # High quality M4A
-            'bestaudio[acodec=aac][abr>=256]/bestaudio[ext=m4a][abr>=256]/'
-            # High quality MP3
-            'bestaudio[acodec=mp3][abr>=320]/bestaudio[ext=mp3][abr>=320]/'
-            # Fallback to best available
-            'bestaudio/best'
-        )
+    @staticmethod
+    def _read_artwork(artwork_file):
+        """Read cover bytes, re-encoded once as an optimized progressive JPEG.
+
+        Spotify covers are baseline JPEGs with EXIF baggage; one pass
+        through libjpeg's Huffman optimizer typically shaves 25-40% off
+        before the same bytes get embedded into every track of the album.
+        """
+        raw = artwork_file.read_bytes()
+        try:
+            buf = BytesIO()
+            with Image.open(BytesIO(raw)) as img:
+                if img.mode != 'RGB':
+                    img = img.convert('RGB')
+                img.save(buf, format='JPEG', quality=90, optimize=True, progressive=True)
+            data = buf.getvalue()
+            # Keep the re-encode only when it actually won
+            return data if len(data) < len(raw) else raw
+        except Exception:
+            return raw
+
+    def get_optimal_ytdl_config(self, temp_dir, is_mobile=False, force_mp3=False):
+        """Get optimized yt-dlp configuration for maximum audio quality.
+
+        force_mp3=True re-encodes everything to MP3 VBR for players that
+        can't handle opus/m4a; the default keeps the source codec.
+        """
         
         config = {
-            'format': format_selector,
+            'format': _FORMAT_SELECTOR,
             'outtmpl': '',  # Will be set dynamically
             
-            # Audio processing
+            # Audio processing - metadata and artwork are written in one
+            # ffmpeg pass by finalize_with_ffmpeg, so no FFmpegMetadata here
             'postprocessors': [
                 {
+                    # 'best' extracts the audio stream without re-encoding;
+                    # transcoding high-quality opus to MP3 is lossy and the
+                    # single biggest CPU cost per track on Termux
                     'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                    'preferredquality': '0',  # Best quality (VBR)
+                    'preferredcodec': 'mp3' if force_mp3 else 'best',
+                    'preferredquality': '0' if force_mp3 else None,
+                    'nopostoverwrites': True,
                 },
-                {
-                    'key': 'FFmpegMetadata',
-                    'add_metadata': True,
-                }
             ],
             
             # Quality settings
@@ -58,60 +130,215 @@ class AudioQualityManager:
             'writethumbnail': False,
             'writeinfojson': False,
             
-            # Performance settings
-            'concurrent_fragment_downloads': 2 if is_mobile else 4,
+            # Performance settings - fragmented DASH/HLS audio downloads much
+            # faster with several fragment connections (tunable via env)
+            'concurrent_fragment_downloads': int(os.getenv(
+                'SPDL_CONCURRENT_FRAGMENTS', '4' if is_mobile else '16')),
+            'buffersize': 65536,
             'retries': 3,
             'fragment_retries': 3,
             'timeout': 30,
             
-            # Output control
-            'quiet': False,
-            'no_warnings': False,
+            # Output control - progress lives in the caller's tqdm bar;
+            # per-chunk console writes stall downloads on slow terminals
+            'quiet': True,
+            'no_warnings': True,
+            'noprogress': True,
             'extractaudio': True,
             'keepvideo': False,
             'noplaylist': True,
             
             # Mobile optimizations
             'socket_timeout': 30,
-            'http_chunk_size': 1048576 if is_mobile else 10485760,  # 1MB vs 10MB chunks
+            'http_chunk_size': 1048576 if is_mobile else 16777216,  # 1MB vs 16MB chunks
         }
-        
+
         # Add mobile-specific optimizations
         if is_mobile:
             config.update({
                 'max_downloads': 1,
-                'concurrent_fragment_downloads': 1,
-                'http_chunk_size': 524288,  # 512KB chunks
-                'buffer_size': 1024,
             })
-        
+
         return config
     
+    def _fsync_dir(self, directory):
+        """Persist the directory entry so a power cut can't orphan the file"""
+        if os.name == 'nt':
+            return
+        try:
+            dir_fd = os.open(str(directory), os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass
+
+    def finalize_with_ffmpeg(self, input_file, output_file, track_info, artwork_path=None):
+        """Tag, attach artwork and move to the final file in one ffmpeg pass.
+
+        Stream-copies the audio when input and output share a container,
+        so the whole finalize step costs a single ffmpeg startup instead
+        of separate metadata + mutagen passes. Falls back to the mutagen
+        path if ffmpeg fails for any reason.
+        """
+        try:
+            input_file = Path(input_file)
+            output_file = Path(output_file)
+
+            cmd = ['ffmpeg', '-i', str(input_file)]
+            # ffmpeg can't write attached pictures into ogg/opus this way;
+            # those get their cover from mutagen after the ffmpeg pass
+            can_attach = output_file.suffix.lower() in ('.mp3', '.m4a', '.flac')
+            if can_attach and artwork_path and Path(artwork_path).exists():
+                cmd += ['-i', str(artwork_path), '-map', '0:a', '-map', '1',
+                        '-c:v', 'copy', '-disposition:v', 'attached_pic']
+            else:
+                cmd += ['-map', '0:a']
+
+            # Same container in and out -> pure stream copy, no re-encode
+            if input_file.suffix.lower() == output_file.suffix.lower():
+                cmd += ['-c:a', 'copy']
+            else:
+                cmd += ['-c:a', 'libmp3lame', '-b:a', '320k']
+
+            metadata = {
+                'title': track_info['name'],
+                'artist': ', '.join(track_info['artists']),
+                'album': track_info['album'],
+                'album_artist': track_info['album_artist'],
+                'track': str(track_info['track_number']),
+                'disc': str(track_info['disc_number']),
+            }
+            if track_info.get('release_year'):
+                metadata['date'] = str(track_info['release_year'])
+            if track_info.get('genres'):
+                metadata['genre'] = ', '.join(track_info['genres'])
+            if track_info.get('isrc'):
+                metadata['TSRC'] = track_info['isrc']
+
+            for key, value in metadata.items():
+                cmd += ['-metadata', f'{key}={value}']
+
+            cmd += ['-id3v2_version', '3', '-y', str(output_file)]
+
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            if result.returncode == 0:
+                # Ogg/opus covers go in as a vorbis comment - the text
+                # tags were already written by the ffmpeg pass above
+                if (not can_attach
+                        and output_file.suffix.lower() in ('.ogg', '.opus')
+                        and artwork_path and Path(artwork_path).exists()):
+                    self._embed_ogg_picture(output_file,
+                                            self._read_artwork(Path(artwork_path)))
+                input_file.unlink(missing_ok=True)
+                self._fsync_dir(output_file.parent)
+                return True
+
+            print(f"⚠️  ffmpeg tagging failed, falling back to mutagen")
+
+        except Exception as e:
+            print(f"⚠️  ffmpeg finalize error: {e}")
+
+        # Fallback: old two-step path (mutagen tags, then move)
+        if self.embed_metadata(input_file, track_info, artwork_path):
+            tagged = input_file if input_file.exists() else input_file.with_suffix('.mp3')
+            try:
+                os.replace(tagged, output_file)
+            except OSError:
+                # Different filesystem (EXDEV) - fall back to a real copy
+                shutil.move(str(tagged), str(output_file))
+            self._fsync_dir(output_file.parent)
+            return True
+        return False
+
     def embed_metadata(self, audio_file, track_info, artwork_path=None):
         """Embed comprehensive metadata into audio file"""
         try:
             audio_file = Path(audio_file)
-            
-            # Determine file type and use appropriate library
-            if audio_file.suffix.lower() == '.mp3':
-                return self._embed_mp3_metadata(audio_file, track_info, artwork_path)
-            elif audio_file.suffix.lower() == '.flac':
-                return self._embed_flac_metadata(audio_file, track_info, artwork_path)
-            else:
-                # Try to convert to MP3 if unsupported format
-                mp3_file = audio_file.with_suffix('.mp3')
-                if self._convert_to_mp3(audio_file, mp3_file):
-                    audio_file.unlink()  # Remove original
-                    return self._embed_mp3_metadata(mp3_file, track_info, artwork_path)
+
+            # Read artwork once up front; read_bytes sizes a single read
+            # to the file, and every format branch shares the same bytes
+            # object - no per-branch re-read or extra copy. Covers repeat
+            # per album, so later tracks hit the in-memory cache.
+            artwork_data = None
+            if artwork_path:
+                # Album names collide (self-titled, "Greatest Hits") - the
+                # cover URL is unique per album, with artist+album as the
+                # fallback key
+                album_key = (track_info.get('album_cover_url')
+                             or (track_info.get('album_artist'), track_info.get('album')))
+                artwork_data = self._artwork_cache.get(album_key)
+                if artwork_data is not None:
+                    self._artwork_cache.move_to_end(album_key)
                 else:
-                    print(f"⚠️  Unsupported format: {audio_file.suffix}")
-                    return False
+                    artwork_file = Path(artwork_path)
+                    if artwork_file.exists():
+                        artwork_data = self._read_artwork(artwork_file)
+                        self._artwork_cache[album_key] = artwork_data
+                        while len(self._artwork_cache) > self._artwork_cache_max:
+                            self._artwork_cache.popitem(last=False)
+
+            # Dispatch on extension - every format we can tag natively
+            # stays in its container instead of round-tripping through
+            # an ffmpeg transcode to MP3
+            embed = self._embed_dispatch.get(audio_file.suffix.lower())
+            if embed is not None:
+                return embed(audio_file, track_info, artwork_data)
+
+            # Try to convert to MP3 if unsupported format
+            mp3_file = audio_file.with_suffix('.mp3')
+            if self._convert_to_mp3(audio_file, mp3_file):
+                audio_file.unlink()  # Remove original
+                return self._embed_mp3_metadata(mp3_file, track_info, artwork_data)
+            else:
+                print(f"⚠️  Unsupported format: {audio_file.suffix}")
+                return False
                     
         except Exception as e:
             print(f"❌ Metadata embedding error: {e}")
             return False
     
-    def _embed_mp3_metadata(self, mp3_file, track_info, artwork_path=None):
+    def embed_metadata_batch(self, jobs, max_workers=None):
+        """Embed metadata for many (audio_file, track_info, artwork_path)
+        jobs at once.
+
+        Tag writes are I/O-bound, so threads overlap them fine, and tracks
+        from the same album share one in-memory copy of the artwork.
+        Returns the per-job success flags in input order.
+        """
+        if not jobs:
+            return []
+
+        if max_workers is None:
+            max_workers = min(8, (os.cpu_count() or 2) * 2)
+
+        # The same album cover shows up once per track - read each path once
+        artwork_cache = {}
+        for _, _, artwork_path in jobs:
+            if artwork_path and artwork_path not in artwork_cache:
+                artwork_file = Path(artwork_path)
+                artwork_cache[artwork_path] = (self._read_artwork(artwork_file)
+                                               if artwork_file.exists() else None)
+
+        def run(job):
+            audio_file, track_info, artwork_path = job
+            audio_file = Path(audio_file)
+            artwork_data = artwork_cache.get(artwork_path)
+            try:
+                embed = self._embed_dispatch.get(audio_file.suffix.lower())
+                if embed is not None:
+                    return embed(audio_file, track_info, artwork_data)
+                # Conversion path - let embed_metadata handle it
+                return self.embed_metadata(audio_file, track_info, artwork_path)
+            except Exception as e:
+                print(f"❌ Metadata embedding error: {e}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(run, jobs))
+
+    def _embed_mp3_metadata(self, mp3_file, track_info, artwork_data=None):
         """Embed metadata into MP3 file using mutagen"""
         try:
             # Load or create ID3 tags
@@ -124,39 +351,42 @@ class AudioQualityManager:
                 audio.add_tags()
             
             tags = audio.tags
-            
-            # Clear existing tags to avoid conflicts
-            tags.clear()
-            
+
+            # setall replaces each frame in place - one dict store per
+            # frame instead of a delete pass followed by an add pass
+
             # Basic metadata
-            tags.add(TIT2(encoding=3, text=track_info['name']))
-            tags.add(TPE1(encoding=3, text=', '.join(track_info['artists'])))
-            tags.add(TALB(encoding=3, text=track_info['album']))
-            tags.add(TPE2(encoding=3, text=track_info['album_artist']))
-            
+            tags.setall('TIT2', [TIT2(encoding=3, text=track_info['name'])])
+            tags.setall('TPE1', [TPE1(encoding=3, text=', '.join(track_info['artists']))])
+            tags.setall('TALB', [TALB(encoding=3, text=track_info['album'])])
+            tags.setall('TPE2', [TPE2(encoding=3, text=track_info['album_artist'])])
+
             # Track numbers
-            tags.add(TRCK(encoding=3, text=f"{track_info['track_number']}/{track_info.get('total_tracks', '')}"))
-            tags.add(TPOS(encoding=3, text=str(track_info['disc_number'])))
-            
+            tags.setall('TRCK', [TRCK(encoding=3, text=f"{track_info['track_number']}/{track_info.get('total_tracks', '')}")])
+            tags.setall('TPOS', [TPOS(encoding=3, text=str(track_info['disc_number']))])
+
             # Release date
             if track_info['release_year']:
-                tags.add(TDRC(encoding=3, text=str(track_info['release_year'])))
-            
+                tags.setall('TDRC', [TDRC(encoding=3, text=str(track_info['release_year']))])
+            else:
+                tags.delall('TDRC')
+
             # Genre
             if track_info.get('genres'):
-                tags.add(TCON(encoding=3, text=', '.join(track_info['genres'])))
-            
+                tags.setall('TCON', [TCON(encoding=3, text=', '.join(track_info['genres']))])
+            else:
+                tags.delall('TCON')
+
             # Comments
-            comment_text = f"Downloaded from YouTube | Spotify: {track_info.get('spotify_url', '')}"
-            if track_info.get('isrc'):
-                comment_text += f" | ISRC: {track_info['isrc']}"
-            tags.add(COMM(encoding=3, lang='eng', desc='', text=comment_text))
-            
-            # Album artwork
-            if artwork_path and Path(artwork_path).exists():
-                with open(artwork_path, 'rb') as f:
-                    artwork_data = f.read()
-                
+            isrc = track_info.get('isrc')
+            comment_text = (f"Downloaded from YouTube | Spotify: {track_info.get('spotify_url', '')}"
+                            + (f" | ISRC: {isrc}" if isrc else ""))
+            tags.setall('COMM', [COMM(encoding=3, lang='eng', desc='', text=comment_text)])
+
+            # Album artwork - drop any stale cover even when we have no
+            # replacement to embed
+            tags.delall('APIC')
+            if artwork_data:
                 tags.add(APIC(
                     encoding=3,
                     mime='image/jpeg',
@@ -166,8 +396,9 @@ class AudioQualityManager:
                 ))
                 print("🎨 Embedded album artwork")
             
-            # Save tags
-            audio.save(v2_version=3)
+            # Save tags, leaving a little padding so future edits don't
+            # trigger a full-file rewrite
+            audio.save(v2_version=3, padding=lambda info: 4096)
             print("✅ MP3 metadata embedded successfully")
             return True
             
@@ -175,7 +406,7 @@ class AudioQualityManager:
             print(f"❌ MP3 metadata error: {e}")
             return False
     
-    def _embed_flac_metadata(self, flac_file, track_info, artwork_path=None):
+    def _embed_flac_metadata(self, flac_file, track_info, artwork_data=None):
         """Embed metadata into FLAC file"""
         try:
             audio = FLAC(flac_file)
@@ -207,10 +438,7 @@ class AudioQualityManager:
             audio['COMMENT'] = f"Downloaded from YouTube | Spotify: {track_info.get('spotify_url', '')}"
             
             # Album artwork
-            if artwork_path and Path(artwork_path).exists():
-                with open(artwork_path, 'rb') as f:
-                    artwork_data = f.read()
-                
+            if artwork_data:
                 picture = mutagen.flac.Picture()
                 picture.type = 3  # Cover (front)
                 picture.mime = 'image/jpeg'
@@ -220,26 +448,137 @@ class AudioQualityManager:
                 audio.add_picture(picture)
                 print("🎨 Embedded FLAC artwork")
             
-            # Save
-            audio.save()
+            # Save, reserving padding so the PICTURE block fits inside the
+            # metadata region next time - without it any later tag edit
+            # shifts the entire audio payload
+            audio.save(padding=lambda info: max(info.padding, 65536))
             print("✅ FLAC metadata embedded successfully")
             return True
             
         except Exception as e:
             print(f"❌ FLAC metadata error: {e}")
             return False
-    
+
+    def _embed_m4a_metadata(self, m4a_file, track_info, artwork_data=None):
+        """Embed metadata into M4A/MP4 file"""
+        try:
+            audio = MP4(m4a_file)
+
+            # Basic metadata
+            audio['\xa9nam'] = [track_info['name']]
+            audio['\xa9ART'] = [', '.join(track_info['artists'])]
+            audio['\xa9alb'] = [track_info['album']]
+            audio['aART'] = [track_info['album_artist']]
+            audio['trkn'] = [(track_info['track_number'], track_info.get('total_tracks') or 0)]
+            audio['disk'] = [(track_info['disc_number'], 0)]
+
+            # Release date
+            if track_info['release_year']:
+                audio['\xa9day'] = [str(track_info['release_year'])]
+
+            # Genre
+            if track_info.get('genres'):
+                audio['\xa9gen'] = [', '.join(track_info['genres'])]
+
+            # Comments
+            audio['\xa9cmt'] = [f"Downloaded from YouTube | Spotify: {track_info.get('spotify_url', '')}"]
+
+            # Album artwork
+            if artwork_data:
+                audio['covr'] = [MP4Cover(artwork_data, imageformat=MP4Cover.FORMAT_JPEG)]
+                print("🎨 Embedded album artwork")
+
+            audio.save()
+            print("✅ M4A metadata embedded successfully")
+            return True
+
+        except Exception as e:
+            print(f"❌ M4A metadata error: {e}")
+            return False
+
+    @staticmethod
+    def _ogg_picture_comment(artwork_data):
+        """Build the base64 METADATA_BLOCK_PICTURE comment for a cover"""
+        picture = mutagen.flac.Picture()
+        picture.type = 3  # Cover (front)
+        picture.mime = 'image/jpeg'
+        picture.desc = 'Album Cover'
+        picture.data = artwork_data
+        return base64.b64encode(picture.write()).decode('ascii')
+
+    def _embed_ogg_picture(self, ogg_file, artwork_data):
+        """Attach cover art to an Ogg/Opus file.
+
+        ffmpeg can't write attached pictures into ogg containers, so the
+        single-pass finalize hands just the picture to mutagen.
+        """
+        try:
+            audio = _load_audio(ogg_file)
+            audio['METADATA_BLOCK_PICTURE'] = [self._ogg_picture_comment(artwork_data)]
+            audio.save()
+            print("🎨 Embedded album artwork")
+            return True
+        except Exception as e:
+            print(f"⚠️  Ogg artwork embed failed: {e}")
+            return False
+
+    def _embed_ogg_metadata(self, ogg_file, track_info, artwork_data=None):
+        """Embed metadata into Ogg Vorbis/Opus file"""
+        try:
+            # Vorbis comments are identical for .ogg and .opus; only the
+            # container parser differs
+            audio = _load_audio(ogg_file)
+
+            # Basic metadata
+            audio['TITLE'] = track_info['name']
+            audio['ARTIST'] = ', '.join(track_info['artists'])
+            audio['ALBUM'] = track_info['album']
+            audio['ALBUMARTIST'] = track_info['album_artist']
+            audio['TRACKNUMBER'] = str(track_info['track_number'])
+            audio['DISCNUMBER'] = str(track_info['disc_number'])
+
+            # Release date
+            if track_info['release_year']:
+                audio['DATE'] = str(track_info['release_year'])
+
+            # Genre
+            if track_info.get('genres'):
+                audio['GENRE'] = ', '.join(track_info['genres'])
+
+            # Additional metadata
+            if track_info.get('isrc'):
+                audio['ISRC'] = track_info['isrc']
+
+            # Comments
+            audio['COMMENT'] = f"Downloaded from YouTube | Spotify: {track_info.get('spotify_url', '')}"
+
+            # Album artwork - ogg carries covers as a base64 FLAC picture
+            # block in a vorbis comment
+            if artwork_data:
+                audio['METADATA_BLOCK_PICTURE'] = [self._ogg_picture_comment(artwork_data)]
+                print("🎨 Embedded album artwork")
+
+            audio.save()
+            print("✅ OGG metadata embedded successfully")
+            return True
+
+        except Exception as e:
+            print(f"❌ OGG metadata error: {e}")
+            return False
+
     def _convert_to_mp3(self, input_file, output_file):
         """Convert audio file to MP3 using ffmpeg"""
         try:
             cmd = [
-                'ffmpeg', '-i', str(input_file),
+                'ffmpeg', '-nostdin', '-hide_banner', '-loglevel', 'error',
+                '-i', str(input_file),
+                '-map', '0:a',
                 '-codec:a', 'libmp3lame',
                 '-b:a', '320k',
                 '-y',  # Overwrite output file
                 str(output_file)
             ]
-            
+
             result = subprocess.run(cmd, capture_output=True, text=True)
             
             if result.returncode == 0:
@@ -257,7 +596,7 @@ class AudioQualityManager:
         """Apply audio quality optimizations"""
         try:
             # Analyze audio properties
-            audio = mutagen.File(audio_file)
+            audio = _load_audio(audio_file)
             if audio is None:
                 return False
             
@@ -281,7 +620,7 @@ class AudioQualityManager:
         """Verify audio file integrity"""
         try:
             # Try to load the file
-            audio = mutagen.File(audio_file)
+            audio = _load_audio(audio_file)
             if audio is None:
                 return False
             
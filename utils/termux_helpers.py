@@ -5,20 +5,67 @@ Termux-specific helper functions for Android environment
 import os
 import subprocess
 import json
+import threading
 from pathlib import Path
 
+# Detected once at import time - the PREFIX env var and the stat on the
+# Termux data dir never change for the lifetime of the process
+_PREFIX = os.environ.get('PREFIX', '')
+IS_TERMUX = (
+    _PREFIX.startswith('/data/data/com.termux') or
+    'com.termux' in _PREFIX or
+    os.path.isdir('/data/data/com.termux')
+)
+
 class TermuxHelper:
+
+    _SENTINEL = '---TERMUX-DONE---'
+
     def __init__(self):
         self.is_termux = self.is_termux_environment()
         self.termux_api_available = self.check_termux_api()
-    
+        # One long-lived shell for the polling termux-api queries - each
+        # fork/exec of a termux-* binary costs hundreds of ms on Android,
+        # so battery/wifi polls amortize a single fork across the session
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    def _run_termux(self, cmd, timeout=5):
+        """Run a termux-api command through the persistent shell worker.
+
+        Returns stdout as text, or None if the command failed. The shell
+        itself is forked once and reused; per-command timeouts are
+        delegated to the shell's timeout(1).
+        """
+        with self._worker_lock:
+            try:
+                if self._worker is None or self._worker.poll() is not None:
+                    self._worker = subprocess.Popen(
+                        ['sh'],
+                        stdin=subprocess.PIPE,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.DEVNULL,
+                        text=True)
+                self._worker.stdin.write(f'timeout {timeout} {cmd}; echo {self._SENTINEL}\n')
+                self._worker.stdin.flush()
+
+                lines = []
+                for line in self._worker.stdout:
+                    if line.strip() == self._SENTINEL:
+                        return ''.join(lines)
+                    lines.append(line)
+
+                # stdout hit EOF - the worker died, start fresh next time
+                self._worker = None
+                return None
+
+            except Exception:
+                self._worker = None
+                return None
+
     def is_termux_environment(self):
         """Check if running in Termux environment"""
-        return (
-            os.environ.get('PREFIX', '').startswith('/data/data/com.termux') or
-            'com.termux' in os.environ.get('PREFIX', '') or
-            Path('/data/data/com.termux').exists()
-        )
+        return IS_TERMUX
     
     def check_termux_api(self):
         """Check if Termux:API is available"""
@@ -75,10 +122,10 @@ class TermuxHelper:
             return False
     
     def send_notification(self, title, content, priority="default"):
-        """Send Android notification"""
+        """Send Android notification (fire-and-forget)"""
         if not self.is_termux or not self.termux_api_available:
             return False
-        
+
         try:
             cmd = [
                 'termux-notification',
@@ -87,10 +134,15 @@ class TermuxHelper:
                 '--priority', priority,
                 '--ongoing'
             ]
-            
-            subprocess.run(cmd, capture_output=True, timeout=5)
+
+            # Don't block on the notification round trip - the result is
+            # never inspected, so spawn and move on
+            subprocess.Popen(cmd,
+                             stdin=subprocess.DEVNULL,
+                             stdout=subprocess.DEVNULL,
+                             stderr=subprocess.DEVNULL)
             return True
-            
+
         except Exception as e:
             print(f"⚠️  Notification failed: {e}")
             return False
@@ -111,16 +163,10 @@ class TermuxHelper:
         """Get battery status information"""
         if not self.is_termux or not self.termux_api_available:
             return None
-        
+
         try:
-            result = subprocess.run(['termux-battery-status'], 
-                                  capture_output=True, text=True, timeout=5)
-            
-            if result.returncode == 0:
-                return json.loads(result.stdout)
-            else:
-                return None
-                
+            output = self._run_termux('termux-battery-status')
+            return json.loads(output) if output else None
         except Exception:
             return None
     
@@ -128,16 +174,10 @@ class TermuxHelper:
         """Get WiFi connection information"""
         if not self.is_termux or not self.termux_api_available:
             return None
-        
+
         try:
-            result = subprocess.run(['termux-wifi-connectioninfo'], 
-                                  capture_output=True, text=True, timeout=5)
-            
-            if result.returncode == 0:
-                return json.loads(result.stdout)
-            else:
-                return None
-                
+            output = self._run_termux('termux-wifi-connectioninfo')
+            return json.loads(output) if output else None
         except Exception:
             return None
     